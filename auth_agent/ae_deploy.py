@@ -6,38 +6,25 @@ import sys
 import time
 
 import vertexai
-from dotenv import load_dotenv
 from google.cloud import secretmanager
 
-load_dotenv()
+from config import get_config
 
 ########################################################
-# Change the following variables to match your project
+# Change the following variables in .env to match your project
 ########################################################
-PROJECT_ID = os.getenv("GOOGLE_CLOUD_PROJECT")
-LOCATION = os.getenv("GOOGLE_CLOUD_LOCATION")
-DISPLAY_NAME = os.getenv("DISPLAY_NAME")
-STAGING_BUCKET = os.getenv("STAGING_BUCKET")
-AUTH_ID = os.getenv("AUTH_ID")
-
-########################################################
-
 # Validate required environment variables
-required_vars = {
-    "GOOGLE_CLOUD_PROJECT": PROJECT_ID,
-    "GOOGLE_CLOUD_LOCATION": LOCATION,
-    "DISPLAY_NAME": DISPLAY_NAME,
-    "STAGING_BUCKET": STAGING_BUCKET,
-    "AUTH_ID": AUTH_ID,
-}
+config = get_config().require(
+    "project_id", "location", "display_name", "staging_bucket", "auth_id"
+)
 
-missing_vars = [
-    var_name for var_name, var_value in required_vars.items() if var_value is None
-]
-if missing_vars:
-    raise ValueError(
-        f"Missing required environment variables: {', '.join(missing_vars)}"
-    )
+PROJECT_ID = config.project_id
+LOCATION = config.location
+DISPLAY_NAME = config.display_name
+STAGING_BUCKET = config.staging_bucket
+AUTH_ID = config.auth_id
+
+########################################################
 
 print(f"PROJECT_ID: {PROJECT_ID}")
 print(f"LOCATION: {LOCATION}")
@@ -55,6 +42,14 @@ def get_secret(secret_id, project_id):
 ENV_VARS = {
     "GOOGLE_GENAI_USE_VERTEXAI": "TRUE",
     "AGENTSPACE_AUTH_ID": AUTH_ID,
+    "EMAIL_DELIVERY_MODE": os.getenv("EMAIL_DELIVERY_MODE", "sync"),
+    "AUTH_FAST_PATH": os.getenv("AUTH_FAST_PATH", "true"),
+    "SERVICENOW_INSTANCE": config.servicenow_instance or "",
+    "SERVICENOW_AUTH_ID": os.getenv("SERVICENOW_AUTH_ID", ""),
+    "AGENT_PROFILE_RATE": os.getenv("AGENT_PROFILE_RATE", "0"),
+    "AGENT_PROFILE_DIR": os.getenv(
+        "AGENT_PROFILE_DIR", f"{STAGING_BUCKET.rstrip('/')}/profiles"
+    ),
 }
 EXTRA_PACKAGES = ["./auth_agent"]
 REQUIREMENTS = [
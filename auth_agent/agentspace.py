@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Agentspace Registration Client
+
+Python client for the Discovery Engine agent and authorization APIs used by
+register.sh. All calls share one authenticated, pooled HTTP session, and the
+project number and OAuth client secrets are looked up once per run.
+
+Usage:
+    python agentspace.py create-auth
+    python agentspace.py register-auth
+    python agentspace.py list
+    python agentspace.py list helloworld
+    python agentspace.py update-auth <AGENT_ID>
+    python agentspace.py delete <AGENT_ID>
+    python agentspace.py delete-auth
+    python agentspace.py apply
+    python agentspace.py bulk-delete --match "test-*" --dry-run
+    python agentspace.py bulk-update --match "helloworld*"
+"""
+
+import argparse
+import fnmatch
+import functools
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List
+
+import google.auth
+from google.auth.transport.requests import AuthorizedSession
+from google.cloud import secretmanager
+from requests.adapters import HTTPAdapter
+
+from config import get_config, get_project_number
+
+DISCOVERY_ENGINE_URL = "https://discoveryengine.googleapis.com/v1alpha"
+DESCRIPTION = "This is your AI productivity agent"
+TOOL_DESCRIPTION = "You are a AI productivity agent."
+LOCATION = "us-central1"
+OAUTH_TOKEN_URI = "https://oauth2.googleapis.com/token"
+
+# Connection pool size of the shared HTTP session
+POOL_SIZE = 16
+
+# Default number of concurrent requests for bulk operations
+BULK_WORKERS = 8
+
+
+@functools.lru_cache(maxsize=None)
+def get_secret(secret_id: str, project_id: str) -> str:
+    """Read the latest version of a Secret Manager secret."""
+    client = secretmanager.SecretManagerServiceClient()
+    name = f"projects/{project_id}/secrets/{secret_id}/versions/latest"
+    response = client.access_secret_version(request={"name": name})
+    return response.payload.data.decode("UTF-8")
+
+
+class AgentspaceClient:
+    """Client for Agentspace agents and authorizations of one app."""
+
+    def __init__(
+        self,
+        project_id: str,
+        app_id: str,
+        display_name: str,
+        auth_id: str,
+        engine_id: str | None = None,
+        oauth_auth_uri: str | None = None,
+    ):
+        self.project_id = project_id
+        self.project_number = get_project_number(project_id)
+        self.app_id = app_id
+        self.display_name = display_name
+        self.auth_id = auth_id
+        self.engine_id = engine_id
+        self.oauth_auth_uri = oauth_auth_uri
+
+        credentials, _ = google.auth.default(
+            scopes=["https://www.googleapis.com/auth/cloud-platform"]
+        )
+        self.session = AuthorizedSession(credentials)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(
+            {
+                "Content-Type": "application/json",
+                "X-Goog-User-Project": self.project_number,
+            }
+        )
+
+    @property
+    def agents_url(self) -> str:
+        return (
+            f"{DISCOVERY_ENGINE_URL}/projects/{self.project_number}/locations/global"
+            f"/collections/default_collection/engines/{self.app_id}"
+            f"/assistants/default_assistant/agents"
+        )
+
+    @property
+    def authorization_name(self) -> str:
+        return (
+            f"projects/{self.project_number}/locations/global"
+            f"/authorizations/{self.auth_id}"
+        )
+
+    def _request(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
+        response = self.session.request(method, url, **kwargs)
+        response.raise_for_status()
+        return response.json() if response.content else {}
+
+    def agent_body(
+        self, with_auth: bool = True, display_name: str | None = None
+    ) -> Dict[str, Any]:
+        """Build the agent definition registered with Agentspace."""
+        if not self.engine_id:
+            raise ValueError("ENGINE_ID is required to register an agent")
+        definition = {
+            "tool_settings": {"tool_description": TOOL_DESCRIPTION},
+            "provisioned_reasoning_engine": {
+                "reasoning_engine": (
+                    f"projects/{self.project_number}/locations/{LOCATION}"
+                    f"/reasoningEngines/{self.engine_id}"
+                )
+            },
+        }
+        if with_auth:
+            definition["authorizations"] = [self.authorization_name]
+        return {
+            "displayName": display_name or self.display_name,
+            "description": DESCRIPTION,
+            "adk_agent_definition": definition,
+        }
+
+    # Authorizations
+
+    def get_auth(self) -> Dict[str, Any] | None:
+        """Return the authorization, or None if it does not exist."""
+        response = self.session.get(f"{DISCOVERY_ENGINE_URL}/{self.authorization_name}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def create_auth(self) -> Dict[str, Any]:
+        """Create the OAuth authorization used by the agent."""
+        if not self.oauth_auth_uri:
+            raise ValueError("OAUTH_AUTH_URI is required, run create_oauth_uri.py")
+        return self._request(
+            "POST",
+            f"{DISCOVERY_ENGINE_URL}/projects/{self.project_number}"
+            f"/locations/global/authorizations",
+            params={"authorizationId": self.auth_id},
+            json={
+                "name": self.authorization_name,
+                "serverSideOauth2": {
+                    "clientId": get_secret("AGENTSPACE_WEB_CLIENTID", self.project_id),
+                    "clientSecret": get_secret(
+                        "AGENTSPACE_WEB_CLIENTSECRET", self.project_id
+                    ),
+                    "authorizationUri": self.oauth_auth_uri,
+                    "tokenUri": OAUTH_TOKEN_URI,
+                },
+            },
+        )
+
+    def delete_auth(self) -> Dict[str, Any]:
+        """Delete the OAuth authorization."""
+        return self._request(
+            "DELETE", f"{DISCOVERY_ENGINE_URL}/{self.authorization_name}"
+        )
+
+    # Agents
+
+    def iter_agents(
+        self, page_size: int = 100, server_filter: str | None = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all agents of the app, following pagination.
+
+        The next page is requested in the background while the current one
+        is being consumed.
+
+        Args:
+            page_size: Agents per request
+            server_filter: Filter expression evaluated by the API
+        """
+
+        def fetch(page_token: str | None) -> Dict[str, Any]:
+            params = {"pageSize": page_size}
+            if server_filter:
+                params["filter"] = server_filter
+            if page_token:
+                params["pageToken"] = page_token
+            return self._request("GET", self.agents_url, params=params)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(fetch, None)
+            while future is not None:
+                page = future.result()
+                token = page.get("nextPageToken")
+                future = executor.submit(fetch, token) if token else None
+                yield from page.get("agents", [])
+
+    def list_agents(
+        self,
+        name: str | None = None,
+        match: str | None = None,
+        server_filter: str | None = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        List agents, optionally filtered.
+
+        Args:
+            name: Keep agents whose displayName contains this (case-insensitive)
+            match: Keep agents whose displayName matches this glob pattern
+            server_filter: Filter expression evaluated by the API
+
+        Returns:
+            List of agents
+        """
+        agents = []
+        for agent in self.iter_agents(server_filter=server_filter):
+            display_name = agent.get("displayName", "")
+            if name and name.lower() not in display_name.lower():
+                continue
+            if match and not fnmatch.fnmatchcase(display_name, match):
+                continue
+            agents.append(agent)
+        return agents
+
+    def register(self, with_auth: bool = True) -> Dict[str, Any]:
+        """Register the Reasoning Engine as an Agentspace agent."""
+        return self._request("POST", self.agents_url, json=self.agent_body(with_auth))
+
+    def update(self, agent_id: str, with_auth: bool = True) -> Dict[str, Any]:
+        """Update an agent with the current configuration."""
+        return self._request(
+            "PATCH", f"{self.agents_url}/{agent_id}", json=self.agent_body(with_auth)
+        )
+
+    def delete(self, agent_id: str) -> Dict[str, Any]:
+        """Delete an agent."""
+        return self._request("DELETE", f"{self.agents_url}/{agent_id}")
+
+    def _fan_out(
+        self,
+        operation: Callable[[Dict[str, Any]], Dict[str, Any]],
+        agents: List[Dict[str, Any]],
+        max_workers: int = BULK_WORKERS,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run an operation on each agent concurrently and collect the outcome
+        of every item instead of stopping at the first failure.
+        """
+
+        def run(agent: Dict[str, Any]) -> Dict[str, Any]:
+            result = {
+                "agent_id": agent["name"].split("/")[-1],
+                "displayName": agent.get("displayName"),
+            }
+            try:
+                operation(agent)
+                result["status"] = "ok"
+            except Exception as e:
+                result["status"] = "error"
+                result["error"] = str(e)
+            return result
+
+        if not agents:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            return list(executor.map(run, agents))
+
+    def bulk_delete(
+        self, agents: List[Dict[str, Any]], max_workers: int = BULK_WORKERS
+    ) -> List[Dict[str, Any]]:
+        """Delete agents concurrently and report a result per agent."""
+        return self._fan_out(
+            lambda agent: self.delete(agent["name"].split("/")[-1]),
+            agents,
+            max_workers,
+        )
+
+    def bulk_update(
+        self,
+        agents: List[Dict[str, Any]],
+        with_auth: bool = True,
+        max_workers: int = BULK_WORKERS,
+    ) -> List[Dict[str, Any]]:
+        """
+        Point agents at the configured engine and authorization concurrently,
+        keeping each agent's displayName, and report a result per agent.
+        """
+        return self._fan_out(
+            lambda agent: self._request(
+                "PATCH",
+                f"{self.agents_url}/{agent['name'].split('/')[-1]}",
+                json=self.agent_body(with_auth, display_name=agent.get("displayName")),
+            ),
+            agents,
+            max_workers,
+        )
+
+    def apply(self) -> Dict[str, Any]:
+        """
+        Create or update the authorization and agent so they match the
+        configuration. Running it again with the same configuration is a
+        no-op apart from the agent update.
+        """
+        if self.get_auth() is None:
+            print(f"Creating authorization: {self.auth_id}")
+            self.create_auth()
+        else:
+            print(f"Authorization exists: {self.auth_id}")
+
+        existing = [
+            agent
+            for agent in self.iter_agents()
+            if agent.get("displayName") == self.display_name
+        ]
+        if not existing:
+            print(f"Registering agent: {self.display_name}")
+            return self.register()
+
+        if len(existing) > 1:
+            print(f"Warning: {len(existing)} agents named {self.display_name}")
+        agent_id = existing[0]["name"].split("/")[-1]
+        print(f"Updating agent: {self.display_name} ({agent_id})")
+        return self.update(agent_id)
+
+
+def client_from_env() -> AgentspaceClient:
+    """Create a client from the variables in .env."""
+    config = get_config().require("project_id", "app_id", "display_name", "auth_id")
+    return AgentspaceClient(
+        project_id=config.project_id,
+        app_id=config.app_id,
+        display_name=config.display_name,
+        auth_id=config.auth_id,
+        engine_id=config.engine_id,
+        oauth_auth_uri=config.oauth_auth_uri,
+    )
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    """Print the per-agent results of a bulk operation."""
+    for result in results:
+        line = f"{result['status']:6s} {result['agent_id']:24s} {result['displayName']}"
+        if "error" in result:
+            line += f"  ({result['error']})"
+        print(line)
+    failed = sum(1 for result in results if result["status"] != "ok")
+    print(
+        f"\nTotal: {len(results)}, succeeded: {len(results) - failed}, failed: {failed}"
+    )
+
+
+def main():
+    """Run an Agentspace registration command."""
+    parser = argparse.ArgumentParser(
+        description="Manage Agentspace agents and authorizations. "
+        "All configuration is loaded from .env file"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("register", help="Register the agent without auth")
+    subparsers.add_parser("register-auth", help="Register the agent with auth")
+    subparsers.add_parser("create-auth", help="Create the OAuth authorization")
+    subparsers.add_parser("delete-auth", help="Delete the OAuth authorization")
+    list_parser = subparsers.add_parser("list", help="List agents")
+    list_parser.add_argument("name", nargs="?", help="Filter by displayName")
+    for command, help_text in [
+        ("bulk-delete", "Delete all matching agents"),
+        ("bulk-update", "Update all matching agents with auth"),
+    ]:
+        command_parser = subparsers.add_parser(command, help=help_text)
+        command_parser.add_argument(
+            "--match",
+            required=True,
+            help="Glob pattern on displayName, e.g. 'test-*'",
+        )
+        command_parser.add_argument(
+            "--filter",
+            default=None,
+            help="Filter expression evaluated by the API before --match",
+        )
+        command_parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=BULK_WORKERS,
+            help=f"Concurrent requests (default: {BULK_WORKERS})",
+        )
+        command_parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only print the matching agents",
+        )
+    subparsers.choices["bulk-delete"].add_argument(
+        "--delete-auth",
+        action="store_true",
+        help="Also delete the OAuth authorization (AUTH_ID)",
+    )
+    for command, help_text in [
+        ("update", "Update an agent without auth"),
+        ("update-auth", "Update an agent with auth"),
+        ("delete", "Delete an agent"),
+    ]:
+        command_parser = subparsers.add_parser(command, help=help_text)
+        command_parser.add_argument("agent_id", help="Agent ID")
+    subparsers.add_parser(
+        "apply", help="Create or update the authorization and agent from .env"
+    )
+
+    args = parser.parse_args()
+    client = client_from_env()
+
+    if args.command == "register":
+        result = client.register(with_auth=False)
+    elif args.command == "register-auth":
+        result = client.register()
+    elif args.command == "create-auth":
+        result = client.create_auth()
+    elif args.command == "delete-auth":
+        result = client.delete_auth()
+    elif args.command == "list":
+        result = {"agents": client.list_agents(args.name)}
+    elif args.command == "update":
+        result = client.update(args.agent_id, with_auth=False)
+    elif args.command == "update-auth":
+        result = client.update(args.agent_id)
+    elif args.command == "delete":
+        result = client.delete(args.agent_id)
+    elif args.command in ("bulk-delete", "bulk-update"):
+        agents = client.list_agents(match=args.match, server_filter=args.filter)
+        print(f"Matched {len(agents)} agents")
+        if args.dry_run:
+            for agent in agents:
+                print(
+                    f"  {agent['name'].split('/')[-1]:24s} {agent.get('displayName')}"
+                )
+            return
+        if args.command == "bulk-delete":
+            results = client.bulk_delete(agents, max_workers=args.max_workers)
+        else:
+            results = client.bulk_update(agents, max_workers=args.max_workers)
+        print_results(results)
+        failed = [result for result in results if result["status"] == "error"]
+        if args.command == "bulk-delete" and args.delete_auth:
+            if failed:
+                # Agents that were not deleted still reference the authorization
+                print(
+                    f"Keep AUTH_ID: {client.auth_id}, "
+                    f"{len(failed)} agent(s) failed to delete"
+                )
+            elif client.get_auth() is None:
+                print(f"AUTH_ID not found: {client.auth_id}")
+            else:
+                print(f"Delete AUTH_ID: {client.auth_id}")
+                client.delete_auth()
+        if failed:
+            sys.exit(1)
+        return
+    else:
+        result = client.apply()
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
-import base64
 import logging
 import os
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict
 
 import requests
@@ -9,8 +9,25 @@ from google.adk.agents import LlmAgent
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.tools.function_tool import ToolContext
 from google.cloud import secretmanager
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+
+from .auth_state import (
+    AUTH_STATE_KEY,
+    build_auth_state,
+    get_auth_state,
+    record_state_size,
+)
+from .gmail import build_gmail_service, build_message
+from .history import compact_model_request, record_model_call
+from .outbox import get_outbox
+from .profiling import profiled
+from .router import make_auth_router, record_llm_turn
+from .servicenow import (
+    SERVICENOW_INSTANCE,
+    get_record,
+    get_servicenow_token,
+    search_records,
+)
+from .workspace import list_events, search_drive, user_key
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +37,12 @@ project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
 AUTH_ID = os.getenv(
     "AGENTSPACE_AUTH_ID"
 )  # This is set in .env file (local dev), or in ae_deploy.py (agent engine deployment)
+# "outbox" queues emails for background delivery, "sync" sends them in the tool call
+EMAIL_DELIVERY_MODE = os.getenv("EMAIL_DELIVERY_MODE", "sync")
+TOKENINFO_URL = "https://www.googleapis.com/oauth2/v3/tokeninfo"
 print(f"PROJECT_ID: {project_id}")
 print(f"AUTH_ID: {AUTH_ID}")
+print(f"EMAIL_DELIVERY_MODE: {EMAIL_DELIVERY_MODE}")
 
 
 def extract_user_info(access_token: str) -> Dict[str, Any]:
@@ -30,8 +51,9 @@ def extract_user_info(access_token: str) -> Dict[str, Any]:
     """
 
     try:
-        url = f"https://www.googleapis.com/oauth2/v3/tokeninfo?access_token={access_token}"
-        response = requests.get(url)
+        # Sent as form data, a query string would put the token in URLs
+        # that end up in exception messages and logs
+        response = requests.post(TOKENINFO_URL, data={"access_token": access_token})
 
         if response.status_code == 200:
             token_info = response.json()
@@ -43,7 +65,7 @@ def extract_user_info(access_token: str) -> Dict[str, Any]:
         else:
             return {
                 "status": "error",
-                "message": "Failed to get token info from Google API: {response.status_code} - {response.text}",
+                "message": f"Failed to get token info from Google API: {response.status_code} - {response.text}",
             }
 
     except Exception as e:
@@ -65,10 +87,12 @@ def get_access_token(tool_context: ToolContext) -> str | None:
     return None
 
 
+@profiled
 def check_auth(tool_context: ToolContext):
     """
     Check if the user is authenticated by verifying the presence and validity of the access token
-    in the tool context's state. If authenticated, retrieves and stores user information from Google OAuth.
+    in the tool context's state. If authenticated, stores a compact auth record (email, scopes,
+    expiry) from Google OAuth in the session state.
 
     Args:
         tool_context (ToolContext): The context containing session state and temporary tokens.
@@ -90,18 +114,22 @@ def check_auth(tool_context: ToolContext):
         )  # Log only first 20 chars for security
 
         user_info = extract_user_info(access_token)
-        if user_info:
-            # Store both the token and user info
-            tool_context.state[f"temp:{AUTH_ID}"] = {
-                "access_token": access_token,
-                "user_info": user_info,
-            }
-
-        tool_context.state["user_info"] = user_info
+        if user_info["status"] != "authenticated":
+            # Closes the call for the log analytics, see TOOL_MARKERS
+            logger.error(f"Error checking auth: {user_info['message']}")
+            return user_info
+
+        # Store a single normalized record instead of the whole tokeninfo
+        auth_state = build_auth_state(user_info["user_info"])
+        tool_context.state[AUTH_STATE_KEY] = auth_state
         print(f"check_auth state after: {tool_context.state.to_dict()}")
         return {
             "status": "authenticated",
-            "user_info": user_info,
+            "user_info": {
+                "email": auth_state["email"],
+                "scopes": auth_state["scopes"],
+                "expires_at": auth_state["expires_at"],
+            },
         }
 
     except Exception as e:
@@ -112,6 +140,7 @@ def check_auth(tool_context: ToolContext):
         }
 
 
+@profiled
 def send_email(
     to: str,
     subject: str,
@@ -120,6 +149,9 @@ def send_email(
 ) -> Dict[str, Any]:
     """Send an email using Gmail API with the authenticated user's access token.
 
+    In outbox mode the email is queued and a delivery_id is returned straight
+    away; use get_email_status to follow the delivery.
+
     Example:
         send_email(
             to='joedoe@gmail.com',
@@ -147,24 +179,21 @@ def send_email(
         }
 
     try:
-        # Create credentials object from access token
-        credentials = Credentials(
-            token=access_token,
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=None,  # Not needed for access token usage
-            client_secret=None,  # Not needed for access token usage
-            scopes=["https://www.googleapis.com/auth/gmail.send"],
-        )
+        if EMAIL_DELIVERY_MODE == "outbox":
+            delivery_id = get_outbox().enqueue(to, subject, body, access_token)
+            print(f"Email queued: {delivery_id}")
+            return {
+                "success": True,
+                "delivery_id": delivery_id,
+                "status": "pending",
+                "message": "Email queued for delivery",
+            }
 
         # Build Gmail service
-        service = build("gmail", "v1", credentials=credentials)
+        service = build_gmail_service(access_token)
 
         # Create the email message
-        message = {
-            "raw": base64.urlsafe_b64encode(
-                f"To: {to}\r\nSubject: {subject}\r\n\r\n{body}".encode("utf-8")
-            ).decode("utf-8")
-        }
+        message = build_message(to, subject, body)
 
         # Send the email
         messages_result = (
@@ -185,12 +214,208 @@ def send_email(
         return {"error": str(e), "message": "Failed to send email"}
 
 
+def get_email_status(delivery_id: str) -> Dict[str, Any]:
+    """Get the delivery status of an email queued by send_email.
+
+    Args:
+        delivery_id (str): The delivery_id returned by send_email.
+
+    Returns:
+        Dict[str, Any]: The delivery status (pending, sending, sent or failed),
+        the number of attempts, and the Gmail message id once sent.
+    """
+    status = get_outbox().status(delivery_id)
+    if status is None:
+        return {"error": "Unknown delivery_id", "delivery_id": delivery_id}
+    return {
+        "delivery_id": status["id"],
+        "status": status["status"],
+        "attempts": status["attempts"],
+        "to": status["to_addr"],
+        "subject": status["subject"],
+        "message_id": status["message_id"],
+        "error": status["error"],
+    }
+
+
+@profiled
+def search_drive_files(
+    tool_context: ToolContext,
+    query: str = "",
+    folder_id: str = "",
+    max_results: int = 25,
+) -> Dict[str, Any]:
+    """Search the user's Google Drive files, most recently modified first.
+
+    Example:
+        search_drive_files(query='budget', folder_id='1AbC...')
+
+    Args:
+        tool_context (ToolContext): The tool context containing the access token.
+        query (str): Text the file name must contain. Empty lists all files.
+        folder_id (str): Only list files in this folder. Empty searches all folders.
+        max_results (int): Maximum number of files to return, at most 100.
+
+    Returns:
+        Dict[str, Any]: The files with id, name, mimeType, modifiedTime and webViewLink.
+    """
+    access_token = get_access_token(tool_context)
+    if not access_token:
+        return {
+            "error": "User not authenticated",
+            "message": "Please authenticate first using check_auth",
+        }
+
+    try:
+        user = user_key(get_auth_state(tool_context.state), access_token)
+        return search_drive(access_token, user, query, folder_id, max_results)
+    except Exception as e:
+        logger.error(f"Error searching Drive: {e}")
+        return {"error": str(e), "message": "Failed to search Drive"}
+
+
+@profiled
+def list_calendar_events(
+    tool_context: ToolContext,
+    time_min: str = "",
+    time_max: str = "",
+    calendar_id: str = "primary",
+    max_results: int = 25,
+) -> Dict[str, Any]:
+    """List events of the user's Google Calendar in a time range.
+
+    Example:
+        list_calendar_events(
+            time_min='2025-06-02T00:00:00Z',
+            time_max='2025-06-09T00:00:00Z'
+        )
+
+    Args:
+        tool_context (ToolContext): The tool context containing the access token.
+        time_min (str): Start of the range in RFC 3339. Defaults to the start of today (UTC).
+        time_max (str): End of the range in RFC 3339. Defaults to 7 days after time_min.
+        calendar_id (str): Calendar to read, "primary" for the user's main calendar.
+        max_results (int): Maximum number of events to return, at most 100.
+
+    Returns:
+        Dict[str, Any]: The events with id, summary, start, end, location and htmlLink.
+    """
+    access_token = get_access_token(tool_context)
+    if not access_token:
+        return {
+            "error": "User not authenticated",
+            "message": "Please authenticate first using check_auth",
+        }
+
+    try:
+        # Day-aligned defaults so repeated questions about the week hit the cache
+        start = datetime.now(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        time_min = time_min or start.isoformat()
+        time_max = (
+            time_max
+            or (
+                datetime.fromisoformat(time_min.replace("Z", "+00:00"))
+                + timedelta(days=7)
+            ).isoformat()
+        )
+        user = user_key(get_auth_state(tool_context.state), access_token)
+        return list_events(
+            access_token, user, time_min, time_max, calendar_id, max_results
+        )
+    except Exception as e:
+        logger.error(f"Error listing calendar events: {e}")
+        return {"error": str(e), "message": "Failed to list calendar events"}
+
+
+@profiled
+def search_servicenow_records(
+    tool_context: ToolContext,
+    table: str = "incident",
+    query: str = "",
+    fields: str = "",
+    max_results: int = 20,
+) -> Dict[str, Any]:
+    """Search ServiceNow records, such as incidents, with an encoded query.
+
+    Example:
+        search_servicenow_records(
+            table='incident',
+            query='active=true^priority=1^ORDERBYDESCopened_at'
+        )
+
+    Args:
+        tool_context (ToolContext): The tool context containing the access token.
+        table (str): ServiceNow table to search, e.g. incident.
+        query (str): ServiceNow encoded query. Empty returns all records.
+        fields (str): Comma-separated columns to return. Empty returns a default set.
+        max_results (int): Maximum number of records to return, at most 500.
+
+    Returns:
+        Dict[str, Any]: The matching records.
+    """
+    access_token = get_servicenow_token(tool_context.state)
+    if not access_token:
+        return {
+            "error": "User not authenticated",
+            "message": "No ServiceNow access token found",
+        }
+
+    try:
+        return search_records(
+            SERVICENOW_INSTANCE, access_token, table, query, fields, max_results
+        )
+    except Exception as e:
+        logger.error(f"Error searching ServiceNow: {e}")
+        return {"error": str(e), "message": "Failed to search ServiceNow"}
+
+
+@profiled
+def get_servicenow_record(
+    record_id: str,
+    tool_context: ToolContext,
+    table: str = "incident",
+    fields: str = "",
+) -> Dict[str, Any]:
+    """Look up one ServiceNow record by number (e.g. INC0010001) or sys_id.
+
+    Args:
+        record_id (str): The record number or 32-character sys_id.
+        tool_context (ToolContext): The tool context containing the access token.
+        table (str): ServiceNow table of the record, e.g. incident.
+        fields (str): Comma-separated columns to return. Empty returns a default set.
+
+    Returns:
+        Dict[str, Any]: The record, or an error if it is not found.
+    """
+    access_token = get_servicenow_token(tool_context.state)
+    if not access_token:
+        return {
+            "error": "User not authenticated",
+            "message": "No ServiceNow access token found",
+        }
+
+    try:
+        record = get_record(SERVICENOW_INSTANCE, access_token, table, record_id, fields)
+        if record is None:
+            return {"error": "Record not found", "record_id": record_id}
+        return {"record": record}
+    except Exception as e:
+        logger.error(f"Error getting ServiceNow record: {e}")
+        return {"error": str(e), "message": "Failed to get ServiceNow record"}
+
+
 async def before_agent_callback(callback_context: CallbackContext):
     callback_context.state[f"temp:{AUTH_ID}"] = "xxx"
     print(f"before_agent_callback state: {callback_context.state.to_dict()}")
     return None
 
 
+if EMAIL_DELIVERY_MODE == "outbox":
+    # Resume delivery of messages queued before a restart
+    get_outbox()
+
 root_agent = LlmAgent(
     model="gemini-2.5-flash",
     name="root_agent",
@@ -205,9 +430,32 @@ root_agent = LlmAgent(
     2. If the user says send email:
        2.1 Ask for the recipient's email address, subject, and body of the email.
        2.2 Send emails using send_email tool.
+       2.3 If send_email returns a delivery_id, the email is queued. Use get_email_status
+           with that delivery_id when the user asks whether it was delivered.
+
+    3. If the user asks about their files or documents, use search_drive_files.
+       Pass folder_id to list a folder.
+
+    4. If the user asks about their schedule or meetings, use list_calendar_events
+       with the time range in RFC 3339. Leave it empty for the coming week.
+
+    5. If the user asks about ServiceNow incidents or records, use search_servicenow_records
+       with a ServiceNow encoded query, or get_servicenow_record for a single record number.
 
     Try your best to respond to the user based on the tools you have.
     """,
-    tools=[check_auth, send_email],
+    tools=[check_auth, send_email, search_drive_files, list_calendar_events]
+    + ([get_email_status] if EMAIL_DELIVERY_MODE == "outbox" else [])
+    + (
+        [search_servicenow_records, get_servicenow_record]
+        if SERVICENOW_INSTANCE
+        else []
+    ),
     # before_agent_callback=before_agent_callback,
+    # Answers plain auth checks without calling the model
+    before_agent_callback=make_auth_router(check_auth),
+    after_agent_callback=[record_llm_turn, record_state_size],
+    # Keep the history sent to the model within HISTORY_TOKEN_BUDGET
+    before_model_callback=compact_model_request,
+    after_model_callback=record_model_call,
 )
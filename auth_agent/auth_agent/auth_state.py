@@ -0,0 +1,113 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compact auth session state and per-session state size accounting."""
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict
+
+from google.adk.agents.callback_context import CallbackContext
+
+logger = logging.getLogger(__name__)
+
+# Session state key of the normalized auth record
+AUTH_STATE_KEY = "auth"
+AUTH_STATE_VERSION = 1
+
+# Log a warning when a session's state grows beyond this many bytes
+STATE_SIZE_WARN_BYTES = int(os.getenv("STATE_SIZE_WARN_BYTES", "16384"))
+
+# Sessions kept in state_bytes, least recently updated are evicted first
+STATE_BYTES_SESSIONS = 1024
+
+# Latest state size in bytes per session, see record_state_size
+state_bytes: "OrderedDict[str, int]" = OrderedDict()
+_state_bytes_lock = threading.Lock()
+
+
+def build_auth_state(token_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalize a Google tokeninfo response into the compact auth record.
+
+    Only the fields the agent uses are kept.
+
+    Args:
+        token_info: Response of https://www.googleapis.com/oauth2/v3/tokeninfo
+
+    Returns:
+        Versioned auth record
+    """
+    return {
+        "v": AUTH_STATE_VERSION,
+        "email": token_info.get("email"),
+        "email_verified": str(token_info.get("email_verified")).lower() == "true",
+        "scopes": token_info.get("scope", "").split(),
+        "expires_at": int(token_info["exp"]) if token_info.get("exp") else None,
+    }
+
+
+def get_auth_state(state) -> Dict[str, Any] | None:
+    """
+    Read the auth record from session state.
+
+    Args:
+        state: Session state
+
+    Returns:
+        Auth record, or None if missing or written by another schema version
+    """
+    record = state.get(AUTH_STATE_KEY)
+    if isinstance(record, dict) and record.get("v") == AUTH_STATE_VERSION:
+        return record
+    return None
+
+
+def state_size(state: Dict[str, Any]) -> int:
+    """
+    Size of the session state as serialized JSON.
+
+    Args:
+        state: Session state as a dictionary
+
+    Returns:
+        Size in bytes
+    """
+    return len(json.dumps(state, default=str).encode("utf-8"))
+
+
+async def record_state_size(callback_context: CallbackContext):
+    """
+    After-agent callback that logs the session state size.
+
+    The latest size of the STATE_BYTES_SESSIONS most recently active
+    sessions is kept in state_bytes.
+    """
+    session_id = callback_context.session.id
+    size = state_size(callback_context.state.to_dict())
+    with _state_bytes_lock:
+        state_bytes[session_id] = size
+        state_bytes.move_to_end(session_id)
+        while len(state_bytes) > STATE_BYTES_SESSIONS:
+            state_bytes.popitem(last=False)
+    print(f"state_bytes session={session_id} bytes={size}")
+    if size > STATE_SIZE_WARN_BYTES:
+        logger.warning(
+            f"Session {session_id} state is {size} bytes "
+            f"(limit {STATE_SIZE_WARN_BYTES})"
+        )
+    return None
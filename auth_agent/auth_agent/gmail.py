@@ -0,0 +1,42 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Gmail API helpers shared by send_email and the email outbox."""
+
+import base64
+from typing import Any, Dict
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+
+def build_gmail_service(access_token: str):
+    """Build a Gmail API client from the user's access token."""
+    credentials = Credentials(
+        token=access_token,
+        token_uri="https://oauth2.googleapis.com/token",
+        client_id=None,  # Not needed for access token usage
+        client_secret=None,  # Not needed for access token usage
+        scopes=["https://www.googleapis.com/auth/gmail.send"],
+    )
+    return build("gmail", "v1", credentials=credentials)
+
+
+def build_message(to: str, subject: str, body: str) -> Dict[str, Any]:
+    """Build a Gmail API message resource."""
+    return {
+        "raw": base64.urlsafe_b64encode(
+            f"To: {to}\r\nSubject: {subject}\r\n\r\n{body}".encode("utf-8")
+        ).decode("utf-8")
+    }
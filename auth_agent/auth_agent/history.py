@@ -0,0 +1,186 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Conversation history compaction for model requests.
+
+Before each model call, tool responses from older turns are truncated and
+the oldest turns are dropped until the request fits the token budget. The
+session itself is not modified, only the request sent to the model. Prompt
+size and model latency are kept in history_stats.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+# Estimated token budget of the conversation history sent to the model
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "8000"))
+# Most recent turns whose tool responses are sent in full
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "2"))
+# Older tool responses are cut to this many characters
+TOOL_RESPONSE_MAX_CHARS = int(os.getenv("TOOL_RESPONSE_MAX_CHARS", "300"))
+
+# Rough characters per token, good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+history_stats: Dict[str, float] = {
+    "model_calls": 0,
+    "prompt_tokens_before": 0,
+    "prompt_tokens_after": 0,
+    "prompt_tokens_reported": 0,
+    "turns_dropped": 0,
+    "tool_responses_truncated": 0,
+    "model_seconds": 0.0,
+}
+
+# Model calls timed at once. A call that fails never reaches
+# record_model_call, so the oldest start times are evicted first.
+MODEL_CALLS_STARTED = 1024
+
+# Start time of model calls in progress, keyed by invocation id
+_model_call_started: "OrderedDict[str, float]" = OrderedDict()
+_model_call_started_lock = threading.Lock()
+
+
+def estimate_tokens(contents: List[types.Content]) -> int:
+    """Estimate the token count of contents from their serialized size."""
+    chars = sum(len(content.model_dump_json(exclude_none=True)) for content in contents)
+    return chars // CHARS_PER_TOKEN
+
+
+def split_turns(contents: List[types.Content]) -> List[List[types.Content]]:
+    """
+    Group contents into turns, each starting with a user text message.
+
+    Function responses also have the user role but continue the current turn,
+    so a function call is never separated from its response.
+    """
+    turns: List[List[types.Content]] = []
+    for content in contents:
+        parts = content.parts or []
+        starts_turn = content.role == "user" and any(part.text for part in parts)
+        if starts_turn or not turns:
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def truncate_tool_responses(content: types.Content) -> types.Content:
+    """Return a copy of content with long function responses cut down."""
+    parts = []
+    for part in content.parts or []:
+        response = part.function_response
+        if response is not None:
+            text = json.dumps(response.response, default=str)
+            if len(text) > TOOL_RESPONSE_MAX_CHARS:
+                history_stats["tool_responses_truncated"] += 1
+                part = part.model_copy(
+                    update={
+                        "function_response": response.model_copy(
+                            update={
+                                "response": {
+                                    "truncated": text[:TOOL_RESPONSE_MAX_CHARS]
+                                }
+                            }
+                        )
+                    }
+                )
+        parts.append(part)
+    return content.model_copy(update={"parts": parts})
+
+
+def compact_history(
+    contents: List[types.Content],
+    token_budget: int = HISTORY_TOKEN_BUDGET,
+    keep_turns: int = HISTORY_KEEP_TURNS,
+) -> List[types.Content]:
+    """
+    Compact the conversation history to fit the token budget.
+
+    Args:
+        contents: Request contents, oldest first
+        token_budget: Estimated token budget
+        keep_turns: Number of recent turns whose tool responses are kept
+
+    Returns:
+        Compacted contents. The current turn is always kept.
+    """
+    turns = split_turns(contents)
+    old_count = max(0, len(turns) - keep_turns)
+    turns = [
+        (
+            [truncate_tool_responses(content) for content in turn]
+            if i < old_count
+            else turn
+        )
+        for i, turn in enumerate(turns)
+    ]
+
+    sizes = [estimate_tokens(turn) for turn in turns]
+    total = sum(sizes)
+    dropped = 0
+    while total > token_budget and len(turns) - dropped > 1:
+        total -= sizes[dropped]
+        dropped += 1
+    history_stats["turns_dropped"] += dropped
+
+    return [content for turn in turns[dropped:] for content in turn]
+
+
+async def compact_model_request(
+    callback_context: CallbackContext, llm_request: LlmRequest
+):
+    """Before-model callback that compacts the request history."""
+    before = estimate_tokens(llm_request.contents)
+    llm_request.contents = compact_history(
+        llm_request.contents, HISTORY_TOKEN_BUDGET, HISTORY_KEEP_TURNS
+    )
+    after = estimate_tokens(llm_request.contents)
+
+    history_stats["model_calls"] += 1
+    history_stats["prompt_tokens_before"] += before
+    history_stats["prompt_tokens_after"] += after
+    with _model_call_started_lock:
+        _model_call_started[callback_context.invocation_id] = time.perf_counter()
+        _model_call_started.move_to_end(callback_context.invocation_id)
+        while len(_model_call_started) > MODEL_CALLS_STARTED:
+            _model_call_started.popitem(last=False)
+    print(f"history_tokens before={before} after={after}")
+    return None
+
+
+async def record_model_call(
+    callback_context: CallbackContext, llm_response: LlmResponse
+):
+    """After-model callback that records model latency and prompt tokens."""
+    with _model_call_started_lock:
+        start = _model_call_started.pop(callback_context.invocation_id, None)
+    elapsed = time.perf_counter() - start if start is not None else 0.0
+    history_stats["model_seconds"] += elapsed
+
+    usage = llm_response.usage_metadata
+    prompt_tokens = usage.prompt_token_count if usage else None
+    if prompt_tokens:
+        history_stats["prompt_tokens_reported"] += prompt_tokens
+    print(f"model_call seconds={elapsed:.3f} prompt_tokens={prompt_tokens}")
+    return None
@@ -0,0 +1,260 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Durable email outbox with background delivery.
+
+send_email enqueues messages into a local SQLite database and returns a
+delivery id straight away. Worker threads deliver queued messages through
+Gmail batch requests and retry transient failures with backoff. Messages
+left pending or in flight when the replica stopped are picked up again
+when the outbox starts.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Set
+
+from googleapiclient.errors import HttpError
+
+from .gmail import build_gmail_service, build_message
+
+logger = logging.getLogger(__name__)
+
+EMAIL_OUTBOX_PATH = os.getenv("EMAIL_OUTBOX_PATH", "/tmp/email_outbox.db")
+EMAIL_OUTBOX_WORKERS = int(os.getenv("EMAIL_OUTBOX_WORKERS", "2"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+
+# Messages per Gmail batch request
+BATCH_SIZE = 20
+MAX_BACKOFF_SECONDS = 300
+# Seconds an idle worker waits before checking for due retries
+POLL_SECONDS = 5
+
+# HTTP statuses that are retried, everything else fails the message
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    to_addr TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    access_token TEXT,
+    message_id TEXT,
+    thread_id TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+class EmailOutbox:
+    """SQLite-backed email queue delivered by a pool of worker threads."""
+
+    def __init__(
+        self, path: str = EMAIL_OUTBOX_PATH, workers: int = EMAIL_OUTBOX_WORKERS
+    ):
+        self.path = path
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.threads: List[threading.Thread] = []
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock, self.conn:
+            self.conn.executescript(SCHEMA)
+            # Messages that were in flight when the process stopped
+            self.conn.execute(
+                "UPDATE outbox SET status = 'pending' WHERE status = 'sending'"
+            )
+
+    def start(self) -> None:
+        """Start the worker threads if they are not running yet."""
+        with self.lock:
+            if self.threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run, name=f"email-outbox-{i}", daemon=True
+                )
+                thread.start()
+                self.threads.append(thread)
+
+    def enqueue(self, to: str, subject: str, body: str, access_token: str) -> str:
+        """
+        Queue a message for delivery.
+
+        Returns:
+            Delivery id to pass to status()
+        """
+        delivery_id = uuid.uuid4().hex
+        now = time.time()
+        with self.lock:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT INTO outbox (id, created_at, updated_at, status, "
+                    "next_attempt_at, to_addr, subject, body, access_token) "
+                    "VALUES (?, ?, ?, 'pending', ?, ?, ?, ?, ?)",
+                    (delivery_id, now, now, now, to, subject, body, access_token),
+                )
+            self.wakeup.notify()
+        self.start()
+        return delivery_id
+
+    def status(self, delivery_id: str) -> Dict[str, Any] | None:
+        """Return the delivery status of a message, or None if unknown."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT id, status, attempts, to_addr, subject, message_id, "
+                "thread_id, error FROM outbox WHERE id = ?",
+                (delivery_id,),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def _claim_batch(self) -> List[sqlite3.Row]:
+        """Mark up to BATCH_SIZE due messages as sending and return them."""
+        now = time.time()
+        rows = self.conn.execute(
+            "SELECT * FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? "
+            "ORDER BY next_attempt_at LIMIT ?",
+            (now, BATCH_SIZE),
+        ).fetchall()
+        if rows:
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE outbox SET status = 'sending', attempts = attempts + 1, "
+                    "updated_at = ? WHERE id = ?",
+                    [(now, row["id"]) for row in rows],
+                )
+        return rows
+
+    def _run(self) -> None:
+        while True:
+            with self.lock:
+                rows = self._claim_batch()
+                if not rows:
+                    self.wakeup.wait(timeout=POLL_SECONDS)
+                    continue
+            # Ids of rows already recorded as sent or failed
+            done: Set[str] = set()
+            try:
+                self._deliver(rows, done)
+            except Exception as e:
+                logger.error(f"Email outbox delivery error: {e}")
+                for row in rows:
+                    if row["id"] not in done:
+                        self._record_failure(row, e)
+
+    def _deliver(self, rows: List[sqlite3.Row], done: Set[str]) -> None:
+        """
+        Send claimed messages, one Gmail batch request per access token.
+
+        A failing batch only fails its own messages that have no result yet,
+        messages already sent by an earlier batch keep their status.
+        """
+        by_token: Dict[str, List[sqlite3.Row]] = defaultdict(list)
+        for row in rows:
+            by_token[row["access_token"]].append(row)
+
+        for access_token, token_rows in by_token.items():
+            try:
+                service = build_gmail_service(access_token)
+                batch = service.new_batch_http_request()
+                for row in token_rows:
+                    batch.add(
+                        service.users()
+                        .messages()
+                        .send(
+                            userId="me",
+                            body=build_message(
+                                row["to_addr"], row["subject"], row["body"]
+                            ),
+                        ),
+                        callback=self._callback(row, done),
+                    )
+                batch.execute()
+            except Exception as e:
+                logger.error(f"Email outbox batch error: {e}")
+                for row in token_rows:
+                    if row["id"] not in done:
+                        self._record_failure(row, e)
+                        done.add(row["id"])
+
+    def _callback(self, row: sqlite3.Row, done: Set[str]):
+        def callback(request_id, response, exception):
+            if exception is not None:
+                self._record_failure(row, exception)
+            else:
+                self._record_success(row, response)
+            done.add(row["id"])
+
+        return callback
+
+    def _record_success(self, row: sqlite3.Row, response: Dict[str, Any]) -> None:
+        print(f"Email sent successfully: {response}")
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE outbox SET status = 'sent', message_id = ?, thread_id = ?, "
+                "access_token = NULL, error = NULL, updated_at = ? WHERE id = ?",
+                (response.get("id"), response.get("threadId"), time.time(), row["id"]),
+            )
+
+    def _record_failure(self, row: sqlite3.Row, exception: Exception) -> None:
+        attempts = row["attempts"] + 1
+        retryable = not isinstance(exception, HttpError) or (
+            exception.resp.status in RETRYABLE_STATUSES
+        )
+        now = time.time()
+        logger.error(f"Error sending email: {exception}")
+        with self.lock, self.conn:
+            if retryable and attempts < EMAIL_OUTBOX_MAX_ATTEMPTS:
+                delay = min(MAX_BACKOFF_SECONDS, 2**attempts)
+                self.conn.execute(
+                    "UPDATE outbox SET status = 'pending', next_attempt_at = ?, "
+                    "error = ?, updated_at = ? WHERE id = ?",
+                    (now + delay, str(exception), now, row["id"]),
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE outbox SET status = 'failed', access_token = NULL, "
+                    "error = ?, updated_at = ? WHERE id = ?",
+                    (str(exception), now, row["id"]),
+                )
+
+
+_outbox: EmailOutbox | None = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> EmailOutbox:
+    """Return the process-wide outbox, starting delivery of queued messages."""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = EmailOutbox()
+            _outbox.start()
+        return _outbox
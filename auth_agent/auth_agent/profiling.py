@@ -0,0 +1,130 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Opt-in cProfile sampling of tool calls.
+
+AGENT_PROFILE_RATE is the fraction of calls profiled (default 0, off).
+A session can also opt in by setting the "profile" key of its state to
+true. Each profiled call is written as a pstats file named
+<function>-<timestamp>-<id>.pstats to AGENT_PROFILE_DIR, a local
+directory or a gs:// prefix. `download_logs.py profiles` pulls and
+aggregates them.
+
+When profiling is off, a wrapped call costs one random() draw and a state
+lookup.
+"""
+
+import cProfile
+import functools
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+AGENT_PROFILE_RATE = float(os.getenv("AGENT_PROFILE_RATE", "0"))
+AGENT_PROFILE_DIR = os.getenv(
+    "AGENT_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "agent_profiles")
+)
+
+# Session state key that turns on profiling for every call in the session
+PROFILE_STATE_KEY = "profile"
+
+# Only one profiler can be active per thread, nested calls run unprofiled
+_active = threading.local()
+
+
+def _session_opt_in(args, kwargs) -> bool:
+    tool_context = kwargs.get("tool_context")
+    if tool_context is None:
+        tool_context = next((arg for arg in args if hasattr(arg, "state")), None)
+    if tool_context is None:
+        return False
+    try:
+        return bool(tool_context.state.get(PROFILE_STATE_KEY))
+    except Exception:
+        return False
+
+
+def write_profile(profiler: cProfile.Profile, name: str) -> str:
+    """
+    Write a profile to AGENT_PROFILE_DIR.
+
+    Uploads to Cloud Storage run in a background thread.
+
+    Returns:
+        Path or gs:// URI of the profile
+    """
+    file_name = f"{name}-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.pstats"
+    if not AGENT_PROFILE_DIR.startswith("gs://"):
+        os.makedirs(AGENT_PROFILE_DIR, exist_ok=True)
+        path = os.path.join(AGENT_PROFILE_DIR, file_name)
+        profiler.dump_stats(path)
+        return path
+
+    local_path = os.path.join(tempfile.gettempdir(), file_name)
+    profiler.dump_stats(local_path)
+    bucket_name, _, prefix = AGENT_PROFILE_DIR[len("gs://") :].partition("/")
+    blob_name = f"{prefix.rstrip('/')}/{file_name}" if prefix else file_name
+
+    def upload():
+        from google.cloud import storage
+
+        try:
+            storage.Client().bucket(bucket_name).blob(blob_name).upload_from_filename(
+                local_path
+            )
+        except Exception as e:
+            logger.error(f"Error uploading profile {file_name}: {e}")
+        finally:
+            os.remove(local_path)
+
+    threading.Thread(target=upload, daemon=True).start()
+    return f"gs://{bucket_name}/{blob_name}"
+
+
+def profiled(fn):
+    """Decorator that profiles a sample of calls to fn, see module docstring."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if getattr(_active, "profiler", None) is not None or not (
+            random.random() < AGENT_PROFILE_RATE or _session_opt_in(args, kwargs)
+        ):
+            return fn(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is running in a different thread
+            return fn(*args, **kwargs)
+        _active.profiler = profiler
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            _active.profiler = None
+            try:
+                location = write_profile(profiler, fn.__name__)
+                print(f"profile function={fn.__name__} path={location}")
+            except Exception as e:
+                logger.error(f"Error writing profile of {fn.__name__}: {e}")
+
+    return wrapper
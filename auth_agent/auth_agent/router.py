@@ -0,0 +1,152 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Deterministic fast path for auth-check requests.
+
+Messages that only ask to check authentication are answered by calling
+check_auth directly and rendering a fixed template, skipping the two model
+round-trips (tool selection and result formatting). Anything else falls
+through to the LLM. Hits, misses and the estimated latency saved are counted
+in router_stats.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from .auth_state import record_state_size
+
+# Set to "false" to send every message to the LLM
+AUTH_FAST_PATH = os.getenv("AUTH_FAST_PATH", "true").lower() == "true"
+
+# Whole-message match only, so "check auth and send an email" goes to the LLM
+AUTH_CHECK_PATTERN = re.compile(
+    r"^\s*(please\s+)?(can you\s+|could you\s+)?"
+    r"(check|verify|show|get|what(?:'s| is))\s+(my\s+)?"
+    r"(auth|authentication|authorization|login|auth info|authentication info"
+    r"|authentication information|auth status|authentication status"
+    r"|access scopes?|scopes|permissions)"
+    r"(\s+(info|information|status))?\s*(please)?\s*[?.!]*\s*$",
+    re.IGNORECASE,
+)
+
+router_stats: Dict[str, float] = {
+    "hits": 0,
+    "misses": 0,
+    "fast_path_seconds": 0.0,
+    "llm_turn_seconds": 0.0,
+    "saved_seconds": 0.0,
+}
+
+# LLM turns timed at once. Invocations that end early skip the after-agent
+# callbacks, so the oldest start times are evicted first.
+LLM_TURNS_STARTED = 1024
+
+# Start time of LLM turns in progress, keyed by invocation id
+_llm_turn_started: "OrderedDict[str, float]" = OrderedDict()
+_llm_turn_started_lock = threading.Lock()
+
+
+def user_text(callback_context: CallbackContext) -> str:
+    """Text of the user message that started the invocation."""
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return ""
+    return " ".join(part.text for part in content.parts if part.text)
+
+
+def render_auth_result(result: Dict[str, Any]) -> str:
+    """Render a check_auth result as the agent's reply."""
+    # The error message can quote the failed request, so it is never shown
+    if result.get("status") == "not_authenticated":
+        return "You are not authenticated. Please sign in and try again."
+    if result.get("status") != "authenticated":
+        return "Your authentication could not be verified. Please try again later."
+
+    user_info = result["user_info"]
+    lines = [f"You are authenticated as {user_info.get('email') or 'unknown user'}."]
+    scopes = user_info.get("scopes") or []
+    if scopes:
+        lines.append("Access scopes:")
+        lines.extend(f"- {scope}" for scope in scopes)
+    if user_info.get("expires_at"):
+        expires_at = datetime.fromtimestamp(user_info["expires_at"], tz=timezone.utc)
+        lines.append(f"Token expires at {expires_at.isoformat()}.")
+    return "\n".join(lines)
+
+
+def _average_llm_turn() -> float:
+    if not router_stats["misses"]:
+        return 0.0
+    return router_stats["llm_turn_seconds"] / router_stats["misses"]
+
+
+def make_auth_router(check_auth: Callable[[Any], Dict[str, Any]]):
+    """
+    Build the before-agent callback that routes auth checks past the LLM.
+
+    Args:
+        check_auth: The check_auth tool, called with the callback context
+
+    Returns:
+        before_agent_callback for the agent
+    """
+
+    async def route_auth_check(callback_context: CallbackContext):
+        start = time.perf_counter()
+        if not AUTH_FAST_PATH or not AUTH_CHECK_PATTERN.match(
+            user_text(callback_context)
+        ):
+            router_stats["misses"] += 1
+            with _llm_turn_started_lock:
+                _llm_turn_started[callback_context.invocation_id] = start
+                _llm_turn_started.move_to_end(callback_context.invocation_id)
+                while len(_llm_turn_started) > LLM_TURNS_STARTED:
+                    _llm_turn_started.popitem(last=False)
+            return None
+
+        # CallbackContext exposes the same session state as ToolContext
+        text = render_auth_result(check_auth(callback_context))
+        elapsed = time.perf_counter() - start
+        router_stats["hits"] += 1
+        router_stats["fast_path_seconds"] += elapsed
+        router_stats["saved_seconds"] += max(0.0, _average_llm_turn() - elapsed)
+        print(
+            f"router hit=auth_check seconds={elapsed:.3f} "
+            f"hits={router_stats['hits']} misses={router_stats['misses']} "
+            f"saved_seconds={router_stats['saved_seconds']:.1f}"
+        )
+        # Returning content ends the invocation before the after-agent
+        # callbacks run, so the state size is recorded here
+        await record_state_size(callback_context)
+        return types.Content(role="model", parts=[types.Part(text=text)])
+
+    return route_auth_check
+
+
+async def record_llm_turn(callback_context: CallbackContext):
+    """After-agent callback that times the turns handled by the LLM."""
+    with _llm_turn_started_lock:
+        start = _llm_turn_started.pop(callback_context.invocation_id, None)
+    if start is not None:
+        router_stats["llm_turn_seconds"] += time.perf_counter() - start
+    return None
@@ -0,0 +1,261 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+ServiceNow Table API client for the agent tools.
+
+Requests to an instance share one keep-alive connection pool, select only
+the needed columns with sysparm_fields and read large result sets lazily
+in sysparm_limit/sysparm_offset pages. Results are cached per user for
+SERVICENOW_CACHE_TTL seconds.
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+SERVICENOW_INSTANCE = os.getenv("SERVICENOW_INSTANCE")
+# Agentspace authorization holding the user's ServiceNow token
+SERVICENOW_AUTH_ID = os.getenv("SERVICENOW_AUTH_ID")
+SERVICENOW_CACHE_TTL = float(os.getenv("SERVICENOW_CACHE_TTL", "60"))
+
+# Rows per Table API request
+PAGE_SIZE = 100
+# Upper bound on records returned by one tool call
+MAX_RESULTS = 500
+# Connections kept open per instance
+POOL_SIZE = 10
+REQUEST_TIMEOUT_SECONDS = 30
+# Cached results kept across all users
+CACHE_SIZE = 256
+
+# Columns returned when the caller does not name any
+DEFAULT_FIELDS = {
+    "incident": "sys_id,number,short_description,state,priority,"
+    "assigned_to,opened_at,sys_updated_on",
+}
+FALLBACK_FIELDS = "sys_id,number,short_description,sys_updated_on"
+
+SYS_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+# Record numbers such as INC0010001 or RITM0000123
+RECORD_NUMBER_PATTERN = re.compile(r"^[A-Z]{2,8}[0-9]{4,12}$")
+# Table and column names, checked because the model chooses them
+TABLE_PATTERN = re.compile(r"^[a-z0-9_]+$")
+FIELDS_PATTERN = re.compile(r"^[a-z0-9_.]+(,[a-z0-9_.]+)*$")
+
+_cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Cache hits, misses and Table API requests made
+servicenow_stats: Dict[str, int] = {"hits": 0, "misses": 0, "requests": 0}
+
+
+def get_servicenow_token(state) -> str | None:
+    """
+    Resolve the user's ServiceNow access token.
+
+    ACCESS_TOKEN from .env is used first for local development, then the
+    token Agentspace stores in session state for SERVICENOW_AUTH_ID.
+    """
+    access_token = os.getenv("ACCESS_TOKEN")
+    if access_token:
+        return access_token
+    if not SERVICENOW_AUTH_ID:
+        return None
+    for key in (f"temp:{SERVICENOW_AUTH_ID}", SERVICENOW_AUTH_ID):
+        token = state.get(key)
+        if isinstance(token, str):
+            return token
+        if isinstance(token, dict) and "access_token" in token:
+            return token["access_token"]
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def get_session(instance: str) -> requests.Session:
+    """Pooled keep-alive session of an instance, shared by all users."""
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Accept"] = "application/json"
+    return session
+
+
+def base_url(instance: str) -> str:
+    """Table API URL of an instance, given as host name or full URL."""
+    if "://" not in instance:
+        instance = f"https://{instance}"
+    return f"{instance.rstrip('/')}/api/now/table"
+
+
+def _get(instance: str, access_token: str, path: str, params: Dict[str, Any]):
+    servicenow_stats["requests"] += 1
+    response = get_session(instance).get(
+        f"{base_url(instance)}/{path}",
+        params=params,
+        headers={"Authorization": f"Bearer {access_token}"},
+        timeout=REQUEST_TIMEOUT_SECONDS,
+    )
+    response.raise_for_status()
+    return response.json()["result"]
+
+
+def iter_records(
+    instance: str,
+    access_token: str,
+    table: str,
+    query: str = "",
+    fields: str = "",
+    limit: int = MAX_RESULTS,
+    page_size: int = PAGE_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield records of a table, requesting the next page only when needed.
+
+    Args:
+        instance: ServiceNow instance, e.g. dev12345.service-now.com
+        access_token: User's ServiceNow OAuth token
+        table: Table name, e.g. incident
+        query: Encoded query, e.g. active=true^priority=1
+        fields: Comma-separated columns (default: DEFAULT_FIELDS of the table)
+        limit: Maximum number of records
+        page_size: Records per request
+
+    Raises:
+        ValueError: If table or fields are not valid names
+    """
+    if not TABLE_PATTERN.match(table):
+        raise ValueError(f"Invalid table name: {table!r}")
+    if fields and not FIELDS_PATTERN.match(fields):
+        raise ValueError(f"Invalid fields: {fields!r}")
+    params = {
+        "sysparm_fields": fields or DEFAULT_FIELDS.get(table, FALLBACK_FIELDS),
+        "sysparm_exclude_reference_link": "true",
+        "sysparm_no_count": "true",
+    }
+    if query:
+        params["sysparm_query"] = query
+
+    offset = 0
+    while offset < limit:
+        size = min(page_size, limit - offset)
+        page = _get(
+            instance,
+            access_token,
+            table,
+            {**params, "sysparm_limit": size, "sysparm_offset": offset},
+        )
+        yield from page
+        if len(page) < size:
+            return
+        offset += size
+
+
+def _user_key(access_token: str) -> str:
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:16]
+
+
+def _cached(key: Tuple, fetch) -> Tuple[Any, bool]:
+    """Return (value, cached), calling fetch() when the entry is missing or stale."""
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] > now:
+            _cache.move_to_end(key)
+            servicenow_stats["hits"] += 1
+            return entry[1], True
+
+    servicenow_stats["misses"] += 1
+    value = fetch()
+    with _cache_lock:
+        _cache[key] = (now + SERVICENOW_CACHE_TTL, value)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value, False
+
+
+def search_records(
+    instance: str,
+    access_token: str,
+    table: str,
+    query: str = "",
+    fields: str = "",
+    max_results: int = 20,
+) -> Dict[str, Any]:
+    """
+    Search records of a table, cached per user.
+
+    Returns:
+        {"records": [...], "cached": bool}
+    """
+    max_results = max(1, min(max_results, MAX_RESULTS))
+    key = (_user_key(access_token), instance, table, query, fields, max_results)
+    records, cached = _cached(
+        key,
+        lambda: list(
+            iter_records(instance, access_token, table, query, fields, max_results)
+        ),
+    )
+    return {"records": records, "cached": cached}
+
+
+def get_record(
+    instance: str,
+    access_token: str,
+    table: str,
+    record_id: str,
+    fields: str = "",
+) -> Dict[str, Any] | None:
+    """
+    Look up one record by sys_id or number, cached per user.
+
+    Returns:
+        The record, or None if not found
+
+    Raises:
+        ValueError: If record_id is neither a sys_id nor a record number
+    """
+    if SYS_ID_PATTERN.match(record_id):
+        query = f"sys_id={record_id}"
+    elif RECORD_NUMBER_PATTERN.match(record_id):
+        query = f"number={record_id}"
+    else:
+        raise ValueError(f"Invalid record id: {record_id!r}")
+
+    def fetch() -> List[Dict[str, Any]]:
+        return list(iter_records(instance, access_token, table, query, fields, limit=1))
+
+    key = (_user_key(access_token), instance, table, record_id, fields)
+    records, _ = _cached(key, fetch)
+    return records[0] if records else None
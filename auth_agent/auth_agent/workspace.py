@@ -0,0 +1,240 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Drive and Calendar read helpers with field masks and a revalidated cache.
+
+Listings request only the fields the agent shows, read pages lazily and
+stop at the requested number of results. Results are cached per user and
+query. A Drive hit is revalidated by checking the Drive changes feed for
+anything newer than the cached start page token. A Calendar hit is
+revalidated with an If-None-Match request on the cached ETag. Only when
+something changed is the full listing fetched again.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Tuple
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on results returned by one tool call
+MAX_RESULTS = 100
+# Cached listings kept across all users
+CACHE_SIZE = 256
+
+DRIVE_FILE_FIELDS = "id,name,mimeType,modifiedTime,webViewLink"
+CALENDAR_EVENT_FIELDS = "id,summary,start,end,location,htmlLink"
+
+_cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Revalidated cache hits and full fetches
+cache_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def build_service(api: str, version: str, access_token: str):
+    """Build a Google API client from the user's access token."""
+    credentials = Credentials(token=access_token)
+    return build(api, version, credentials=credentials, cache_discovery=False)
+
+
+def user_key(auth_state: Dict[str, Any] | None, access_token: str) -> str:
+    """Cache key of the user, the email from session state or a token hash."""
+    if auth_state and auth_state.get("email"):
+        return auth_state["email"]
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:16]
+
+
+def _cache_get(key: Tuple) -> Dict[str, Any] | None:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+        return entry
+
+
+def _cache_put(key: Tuple, entry: Dict[str, Any]) -> None:
+    with _cache_lock:
+        _cache[key] = entry
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def iter_pages(
+    collection, request, page: Dict[str, Any] | None = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the pages of a list request, fetching each one on demand.
+
+    Args:
+        collection: API collection the request was made on, e.g. service.files()
+        request: List request of the first page
+        page: Response of request if it was already executed
+    """
+    while request is not None:
+        page = page if page is not None else request.execute()
+        yield page
+        request = collection.list_next(request, page)
+        page = None
+
+
+def take_items(
+    pages: Iterator[Dict[str, Any]], items_key: str, limit: int
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Read items from pages until limit items are collected.
+
+    Returns:
+        (items, first page). No page after the one reaching limit is fetched.
+    """
+    items: List[Dict[str, Any]] = []
+    first_page: Dict[str, Any] = {}
+    for page in pages:
+        first_page = first_page or page
+        items.extend(page.get(items_key, [])[: limit - len(items)])
+        if len(items) >= limit:
+            break
+    return items, first_page
+
+
+def _drive_changed(service, start_page_token: str) -> bool:
+    """Whether anything in the user's Drive changed since start_page_token."""
+    response = (
+        service.changes()
+        .list(
+            pageToken=start_page_token,
+            pageSize=1,
+            fields="nextPageToken,newStartPageToken,changes(fileId)",
+        )
+        .execute()
+    )
+    return bool(response.get("changes")) or "nextPageToken" in response
+
+
+def _quote(value: str) -> str:
+    """Escape a value for a single-quoted Drive query string."""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def search_drive(
+    access_token: str,
+    user: str,
+    query: str = "",
+    folder_id: str = "",
+    max_results: int = 25,
+) -> Dict[str, Any]:
+    """
+    Search the user's Drive files by name and parent folder.
+
+    Returns:
+        {"files": [...], "cached": bool}
+    """
+    max_results = max(1, min(max_results, MAX_RESULTS))
+    clauses = ["trashed = false"]
+    if query:
+        clauses.append(f"name contains '{_quote(query)}'")
+    if folder_id:
+        clauses.append(f"'{_quote(folder_id)}' in parents")
+    q = " and ".join(clauses)
+
+    service = build_service("drive", "v3", access_token)
+    key = (user, "drive", q)
+    cached = _cache_get(key)
+    if (
+        cached is not None
+        and cached["limit"] >= max_results
+        and not _drive_changed(service, cached["start_page_token"])
+    ):
+        cache_stats["hits"] += 1
+        return {"files": cached["files"][:max_results], "cached": True}
+
+    cache_stats["misses"] += 1
+    # Taken before listing so changes made during the listing are not missed
+    start_page_token = (
+        service.changes().getStartPageToken(fields="startPageToken").execute()
+    )["startPageToken"]
+    files = service.files()
+    request = files.list(
+        q=q,
+        pageSize=max_results,
+        orderBy="modifiedTime desc",
+        fields=f"nextPageToken,files({DRIVE_FILE_FIELDS})",
+    )
+    items, _ = take_items(iter_pages(files, request), "files", max_results)
+    _cache_put(
+        key,
+        {"files": items, "limit": max_results, "start_page_token": start_page_token},
+    )
+    return {"files": items, "cached": False}
+
+
+def list_events(
+    access_token: str,
+    user: str,
+    time_min: str,
+    time_max: str,
+    calendar_id: str = "primary",
+    max_results: int = 25,
+) -> Dict[str, Any]:
+    """
+    List events of a calendar between time_min and time_max (RFC 3339).
+
+    Returns:
+        {"events": [...], "cached": bool}
+    """
+    max_results = requested = max(1, min(max_results, MAX_RESULTS))
+    service = build_service("calendar", "v3", access_token)
+    events = service.events()
+
+    def first_page(limit: int):
+        return events.list(
+            calendarId=calendar_id,
+            timeMin=time_min,
+            timeMax=time_max,
+            singleEvents=True,
+            orderBy="startTime",
+            maxResults=limit,
+            fields=f"etag,nextPageToken,items({CALENDAR_EVENT_FIELDS})",
+        )
+
+    key = (user, "calendar", calendar_id, time_min, time_max)
+    cached = _cache_get(key)
+    pages = None
+    if cached is not None and cached["limit"] >= max_results:
+        # Same page size as the cached listing, so the ETag is comparable
+        max_results = cached["limit"]
+        request = first_page(max_results)
+        request.headers["If-None-Match"] = cached["etag"]
+        try:
+            pages = iter_pages(events, request, request.execute())
+        except HttpError as e:
+            if e.resp.status != 304:
+                raise
+            cache_stats["hits"] += 1
+            return {"events": cached["events"][:requested], "cached": True}
+
+    cache_stats["misses"] += 1
+    pages = pages or iter_pages(events, first_page(max_results))
+    items, page = take_items(pages, "items", max_results)
+    if page.get("etag"):
+        _cache_put(key, {"events": items, "limit": max_results, "etag": page["etag"]})
+    return {"events": items[:requested], "cached": False}
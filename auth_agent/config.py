@@ -0,0 +1,127 @@
+"""
+Shared configuration for the deployment and tooling scripts.
+
+.env is parsed once into a validated Config object, and the project number
+is resolved in-process through the Resource Manager API and cached on disk
+keyed by project ID, instead of running `gcloud projects describe`.
+"""
+
+import functools
+import json
+import os
+from dataclasses import dataclass, fields
+
+from dotenv import load_dotenv
+
+# On-disk cache of project ID -> project number
+PROJECT_NUMBER_CACHE = os.path.join(
+    os.path.expanduser("~"), ".cache", "auth_agent", "project_numbers.json"
+)
+
+
+@dataclass(frozen=True)
+class Config:
+    """Values read from .env and the environment."""
+
+    project_id: str | None
+    location: str | None
+    display_name: str | None
+    staging_bucket: str | None
+    app_id: str | None
+    auth_id: str | None
+    engine_id: str | None
+    oauth_auth_uri: str | None
+    servicenow_instance: str | None
+
+    # Environment variable of each field
+    ENV_NAMES = {
+        "project_id": "GOOGLE_CLOUD_PROJECT",
+        "location": "GOOGLE_CLOUD_LOCATION",
+        "display_name": "DISPLAY_NAME",
+        "staging_bucket": "STAGING_BUCKET",
+        "app_id": "APP_ID",
+        "auth_id": "AUTH_ID",
+        "engine_id": "ENGINE_ID",
+        "oauth_auth_uri": "OAUTH_AUTH_URI",
+        "servicenow_instance": "SERVICENOW_INSTANCE",
+    }
+
+    def require(self, *names: str) -> "Config":
+        """
+        Validate that the given fields are set.
+
+        Args:
+            names: Field names, e.g. "project_id"
+
+        Returns:
+            The config itself, for chaining
+
+        Raises:
+            ValueError: If any of the fields is not set
+        """
+        missing_vars = [
+            self.ENV_NAMES[name] for name in names if getattr(self, name) is None
+        ]
+        if missing_vars:
+            raise ValueError(
+                f"Missing required environment variables: {', '.join(missing_vars)}"
+            )
+        return self
+
+
+@functools.lru_cache(maxsize=None)
+def get_config() -> Config:
+    """
+    Load .env and parse the configuration once per process.
+
+    Returns:
+        Config object
+    """
+    load_dotenv()
+    return Config(
+        **{
+            field.name: os.getenv(Config.ENV_NAMES[field.name])
+            for field in fields(Config)
+        }
+    )
+
+
+def _load_cache() -> dict:
+    if not os.path.exists(PROJECT_NUMBER_CACHE):
+        return {}
+    try:
+        with open(PROJECT_NUMBER_CACHE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@functools.lru_cache(maxsize=None)
+def get_project_number(project_id: str) -> str:
+    """
+    Resolve a project number, using the on-disk cache when possible.
+
+    Args:
+        project_id: GCP project ID
+
+    Returns:
+        Project number
+    """
+    cache = _load_cache()
+    if project_id in cache:
+        return cache[project_id]
+
+    from google.cloud import resourcemanager_v3
+
+    project = resourcemanager_v3.ProjectsClient().get_project(
+        name=f"projects/{project_id}"
+    )
+    project_number = project.name.split("/")[-1]
+
+    cache[project_id] = project_number
+    os.makedirs(os.path.dirname(PROJECT_NUMBER_CACHE), exist_ok=True)
+    tmp_path = f"{PROJECT_NUMBER_CACHE}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, PROJECT_NUMBER_CACHE)
+    return project_number
@@ -1,12 +1,10 @@
 import json
-import os
-import subprocess
 
 import google_auth_oauthlib.flow
-from dotenv import load_dotenv
 from google.cloud import secretmanager
 
-load_dotenv()
+from config import get_config, get_project_number
+
 client = secretmanager.SecretManagerServiceClient()
 
 
@@ -16,16 +14,9 @@ def get_secret(secret_id, project_id):
     return response.payload.data.decode("UTF-8")
 
 
-PROJECT_ID = os.getenv("GOOGLE_CLOUD_PROJECT")
+PROJECT_ID = get_config().require("project_id").project_id
 CLIENT_JSON = get_secret("AGENTSPACE_WEB_SECRET_JSON", PROJECT_ID)
-
-result = subprocess.run(
-    ["gcloud", "projects", "describe", PROJECT_ID, "--format=value(projectNumber)"],
-    capture_output=True,
-    text=True,
-    check=True,
-)
-PROJECT_NUMBER = result.stdout.strip()
+PROJECT_NUMBER = get_project_number(PROJECT_ID)
 
 print(f"PROJECT_ID: {PROJECT_ID}")
 print(f"PROJECT_NUMBER: {PROJECT_NUMBER}")
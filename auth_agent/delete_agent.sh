@@ -1,19 +1,12 @@
 #! /bin/env bash
 
-source .env
-
-# Delete existing ADK Agent with the same DISPLAY NAME if any
-OLD_AGENT_ID=$(bash register.sh list ${DISPLAY_NAME} | grep "name" | grep -o '/agents/[0-9]*' | cut -d'/' -f3)
-
-echo "  OLD_AGENT_ID: $OLD_AGENT_ID"
-echo
-
-echo "**********************************************"
-echo "Delete old agentspace agent: $OLD_AGENT_ID"
-bash register.sh delete $OLD_AGENT_ID
-echo
+# Delete existing ADK Agent(s) with the same DISPLAY NAME if any, and the
+# AUTH_ID, in a single call (see agentspace.py bulk-delete)
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "${SCRIPT_DIR}/.env"
 
 echo "**********************************************"
+echo "Delete old agentspace agent(s): $DISPLAY_NAME"
 echo "Delete AUTH_ID: $AUTH_ID"
-bash register.sh delete-auth $AUTH_ID
+cd "${SCRIPT_DIR}" && uv run agentspace.py bulk-delete --match "${DISPLAY_NAME}" --delete-auth
 echo
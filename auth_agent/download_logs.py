@@ -9,21 +9,417 @@ Usage:
     python download_logs.py
     python download_logs.py --minutes 600
     python download_logs.py --reasoning-engine-id 7957944104447377408
+    python download_logs.py --minutes 1440 --parallel 8
+    python download_logs.py --sync
+    python download_logs.py --severity ERROR --text send_email
+    python download_logs.py --follow --minutes 1
+    python download_logs.py --minutes 10080 --parallel 8 --format parquet
+    python download_logs.py --engine 7957944104447377408 --engine europe-west1:123
+    python download_logs.py --discover --discover-location europe-west1
+    python download_logs.py --sqlite logs/logs.db
+    python download_logs.py query --db logs/logs.db --search send_email
+    python download_logs.py analyze --input logs/8904095850381180928.jsonl
+    python download_logs.py profiles --function check_auth
 """
 
 import argparse
+import heapq
 import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterator, List, Tuple
 
+from google.api_core.exceptions import ResourceExhausted
 from google.cloud import logging
 
+from config import get_config
+from log_analytics import parse_invocations, print_report
+from log_export import ParquetExporter
+from log_store import (
+    GROUP_BY_COLUMNS,
+    aggregate_entries,
+    insert_entries,
+    open_store,
+    query_entries,
+)
+from profile_report import print_profile_report, pull_profiles, save_merged
+
+# Retry settings used when the Logging API read quota is exhausted
+MAX_RETRIES = 6
+MAX_BACKOFF_SECONDS = 60
+
+# Largest page size accepted by entries.list
+MAX_PAGE_SIZE = 1000
+
+# Entries buffered per time shard while an earlier shard is being read
+SHARD_PREFETCH = 2 * MAX_PAGE_SIZE
+
+# Separator between location and engine ID in --engine values
+ENGINE_SEPARATOR = ":"
+# Engines fetched at the same time. Each one also runs its own --parallel
+# shards, so at most engines x parallel entries.list calls run at once.
+MAX_ENGINES = 4
+
+# Follow mode re-reads this far behind the newest entry to catch entries
+# that are ingested late, and remembers this many insertIds to skip them
+FOLLOW_LAG_SECONDS = 30
+FOLLOW_SEEN_IDS = 10000
+
+
+def build_filter(
+    location: str,
+    reasoning_engine_id: str,
+    start_time: datetime,
+    end_time: datetime,
+    end_inclusive: bool = True,
+    extra_filters: List[str] | None = None,
+) -> str:
+    """
+    Build the Cloud Logging filter for a Reasoning Engine and time range.
+
+    Args:
+        location: GCP location
+        reasoning_engine_id: Reasoning Engine ID to filter logs
+        start_time: Start of the time range (inclusive)
+        end_time: End of the time range
+        end_inclusive: Whether end_time itself is part of the range
+        extra_filters: Additional filter expressions, ANDed with the rest
+
+    Returns:
+        Filter string
+    """
+    end_op = "<=" if end_inclusive else "<"
+    filter_str = f"""
+    resource.type="aiplatform.googleapis.com/ReasoningEngine"
+    resource.labels.location="{location}"
+    resource.labels.reasoning_engine_id="{reasoning_engine_id}"
+    timestamp>="{start_time.isoformat()}"
+    timestamp{end_op}"{end_time.isoformat()}"
+    """.strip()
+    for expression in extra_filters or []:
+        filter_str += f"\n    {expression}"
+    return filter_str
+
+
+def _quote(value: str) -> str:
+    """Quote a value for use in a Cloud Logging filter."""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def build_extra_filters(
+    project_id: str,
+    severity: str | None = None,
+    text: str | None = None,
+    regex: str | None = None,
+    log_name: str | None = None,
+    labels: List[str] | None = None,
+    text_only: bool = True,
+) -> List[str]:
+    """
+    Build filter expressions evaluated by Cloud Logging, so entries that
+    would be dropped locally are never transferred.
+
+    Args:
+        project_id: GCP project ID, used to expand short log names
+        severity: Minimum severity, e.g. WARNING
+        text: Substring that textPayload must contain
+        regex: RE2 regular expression that textPayload must match
+        log_name: Log name, either short (e.g. stdout) or fully qualified
+        labels: KEY=VALUE pairs that entry labels must match
+        text_only: Only fetch entries with a textPayload
+
+    Returns:
+        List of filter expressions
+    """
+    expressions = []
+    if text_only:
+        expressions.append("textPayload:*")
+    if severity:
+        expressions.append(f"severity>={severity.upper()}")
+    if text:
+        expressions.append(f"textPayload:{_quote(text)}")
+    if regex:
+        expressions.append(f"textPayload=~{_quote(regex)}")
+    if log_name:
+        if not log_name.startswith("projects/"):
+            log_name = (
+                f"projects/{project_id}/logs/{urllib.parse.quote(log_name, safe='')}"
+            )
+        expressions.append(f"logName={_quote(log_name)}")
+    for label in labels or []:
+        key, sep, value = label.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid label filter '{label}', expected KEY=VALUE")
+        expressions.append(f"labels.{_quote(key)}={_quote(value)}")
+    return expressions
+
+
+def split_time_range(
+    start_time: datetime, end_time: datetime, shards: int
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Split a time range into contiguous, equally sized shards.
+
+    Args:
+        start_time: Start of the time range
+        end_time: End of the time range
+        shards: Number of shards
+
+    Returns:
+        List of (start, end) tuples in ascending order
+    """
+    shards = max(1, shards)
+    step = (end_time - start_time) / shards
+    bounds = [start_time + step * i for i in range(shards)] + [end_time]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def entry_to_dict(entry) -> Dict[str, Any]:
+    """
+    Convert a Cloud Logging entry to a dictionary.
+
+    Args:
+        entry: Cloud Logging entry
+
+    Returns:
+        Log entry as a dictionary
+    """
+    return {
+        "textPayload": entry.payload if isinstance(entry.payload, str) else None,
+        "timestamp": entry.timestamp.isoformat() if entry.timestamp else None,
+        "insertId": entry.insert_id,
+        "severity": entry.severity,
+        "reasoningEngineId": (
+            entry.resource.labels.get("reasoning_engine_id")
+            if entry.resource and entry.resource.labels
+            else None
+        ),
+        "trace": entry.trace,
+        "spanId": entry.span_id,
+        "labels": dict(entry.labels) if entry.labels else {},
+        # "resource": {
+        #     "type": entry.resource.type,
+        #     "labels": dict(entry.resource.labels) if entry.resource.labels else {},
+        # },
+        # "logName": entry.log_name,
+        # "receiveTimestamp": (
+        #     entry.received_timestamp.isoformat()
+        #     if entry.received_timestamp
+        #     else None
+        # ),
+    }
+
+
+def iter_entries(
+    client: logging.Client, filter_str: str, page_size: int = MAX_PAGE_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream entries matching a filter, backing off when the read quota is hit.
+
+    list_entries returns a plain generator without page tokens, so after a
+    backoff the query is issued again from the timestamp of the last entry
+    yielded. Entries at that timestamp that were already yielded are skipped
+    by insertId.
+
+    Args:
+        client: Cloud Logging client
+        filter_str: Cloud Logging filter
+        page_size: Number of entries per API call
+
+    Yields:
+        Log entries as dictionaries, in ascending timestamp order
+    """
+    last_timestamp = None
+    # insertIds already yielded at last_timestamp
+    seen_ids: set = set()
+    attempt = 0
+    while True:
+        query = filter_str
+        if last_timestamp is not None:
+            query += f'\n    timestamp>="{last_timestamp}"'
+        try:
+            for entry in client.list_entries(
+                filter_=query, order_by=logging.ASCENDING, page_size=page_size
+            ):
+                log_entry = entry_to_dict(entry)
+                timestamp = log_entry["timestamp"]
+                if timestamp is not None and timestamp == last_timestamp:
+                    if log_entry["insertId"] in seen_ids:
+                        continue
+                elif timestamp is not None:
+                    last_timestamp = timestamp
+                    seen_ids = set()
+                seen_ids.add(log_entry["insertId"])
+                attempt = 0
+                yield log_entry
+            return
+        except ResourceExhausted:
+            attempt += 1
+            if attempt > MAX_RETRIES:
+                raise
+            delay = min(MAX_BACKOFF_SECONDS, 2**attempt) + random.random()
+            print(f"Read quota exceeded, retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+
+def iter_shards(
+    client: logging.Client,
+    filters: List[str],
+    parallel: int = 1,
+    page_size: int = MAX_PAGE_SIZE,
+    prefetch: int = SHARD_PREFETCH,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream several filters concurrently and yield their entries in filter order.
+
+    Each shard is read by a worker into its own bounded queue, so shards
+    ahead of the one being yielded hold at most prefetch entries each.
+
+    Args:
+        client: Cloud Logging client
+        filters: Cloud Logging filters, one per shard
+        parallel: Number of shards read at the same time
+        page_size: Number of entries per API call
+        prefetch: Entries buffered per shard
+
+    Yields:
+        Log entries of the first shard, then the second, and so on
+    """
+    queues = [queue.Queue(maxsize=prefetch) for _ in filters]
+    stop = threading.Event()
+
+    def put(q: queue.Queue, item) -> bool:
+        # Wait for room, unless the consumer has gone away
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def read_shard(filter_str: str, q: queue.Queue) -> None:
+        try:
+            for entry in iter_entries(client, filter_str, page_size=page_size):
+                if not put(q, entry):
+                    return
+            put(q, None)
+        except Exception as e:
+            put(q, e)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, parallel))
+    try:
+        # Workers pick shards up in order, so the shard being yielded is
+        # always running or finished
+        for filter_str, q in zip(filters, queues):
+            executor.submit(read_shard, filter_str, q)
+        for q in queues:
+            while (item := q.get()) is not None:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+    finally:
+        stop.set()
+        executor.shutdown(cancel_futures=True)
+
+
+def iter_logs(
+    project_id: str,
+    reasoning_engine_id: str,
+    location: str = "us-central1",
+    minutes: int = 5,
+    parallel: int = 1,
+    shards: int | None = None,
+    start_time: datetime | None = None,
+    extra_filters: List[str] | None = None,
+    page_size: int = MAX_PAGE_SIZE,
+    client: logging.Client | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream logs from GCP Cloud Logging.
+
+    The time range is split into shards that are fetched concurrently and
+    yielded back in timestamp order, with a bounded number of entries
+    buffered per shard. A single shard is streamed page by page.
+
+    Args:
+        project_id: GCP project ID
+        reasoning_engine_id: Reasoning Engine ID to filter logs
+        location: GCP location (default: us-central1)
+        minutes: Number of minutes to look back (default: 5)
+        parallel: Number of shards fetched concurrently (default: 1)
+        shards: Number of time shards (default: same as parallel)
+        start_time: Start of the time range, overrides minutes when set
+        extra_filters: Additional filter expressions, see build_extra_filters
+        page_size: Number of entries per API call (default: 1000)
+        client: Cloud Logging client to reuse (default: a new client)
+
+    Yields:
+        Log entries as dictionaries, in ascending timestamp order
+    """
+    # Initialize the Cloud Logging client
+    if client is None:
+        client = logging.Client(project=project_id)
+
+    # Calculate time range (last N minutes)
+    end_time = datetime.now(timezone.utc)
+    if start_time is None:
+        start_time = end_time - timedelta(minutes=minutes)
+
+    time_ranges = split_time_range(start_time, end_time, shards or parallel)
+    filters = [
+        build_filter(
+            location,
+            reasoning_engine_id,
+            shard_start,
+            shard_end,
+            end_inclusive=(i == len(time_ranges) - 1),
+            extra_filters=extra_filters,
+        )
+        for i, (shard_start, shard_end) in enumerate(time_ranges)
+    ]
+
+    print(f"Querying logs from {start_time.isoformat()} to {end_time.isoformat()}")
+    print(
+        "Filter: "
+        + build_filter(
+            location,
+            reasoning_engine_id,
+            start_time,
+            end_time,
+            extra_filters=extra_filters,
+        )
+    )
+    print(f"Shards: {len(filters)}, parallel: {parallel}\n")
+
+    if len(filters) == 1:
+        yield from iter_entries(client, filters[0], page_size=page_size)
+        return
+
+    # Shards are contiguous and each is sorted, so concatenating them in
+    # order keeps the result sorted by timestamp.
+    yield from iter_shards(client, filters, parallel=parallel, page_size=page_size)
+
 
 def download_logs(
     project_id: str,
     reasoning_engine_id: str,
     location: str = "us-central1",
     minutes: int = 5,
+    parallel: int = 1,
+    shards: int | None = None,
+    start_time: datetime | None = None,
+    extra_filters: List[str] | None = None,
+    page_size: int = MAX_PAGE_SIZE,
+    client: logging.Client | None = None,
 ) -> List[Dict[str, Any]]:
     """
     Download logs from GCP Cloud Logging.
@@ -33,53 +429,315 @@ def download_logs(
         reasoning_engine_id: Reasoning Engine ID to filter logs
         location: GCP location (default: us-central1)
         minutes: Number of minutes to look back (default: 5)
+        parallel: Number of shards fetched concurrently (default: 1)
+        shards: Number of time shards (default: same as parallel)
+        start_time: Start of the time range, overrides minutes when set
+        extra_filters: Additional filter expressions, see build_extra_filters
+        page_size: Number of entries per API call (default: 1000)
+        client: Cloud Logging client to reuse (default: a new client)
 
     Returns:
         List of log entries as dictionaries
     """
-    # Initialize the Cloud Logging client
+    return list(
+        iter_logs(
+            project_id=project_id,
+            reasoning_engine_id=reasoning_engine_id,
+            location=location,
+            minutes=minutes,
+            parallel=parallel,
+            shards=shards,
+            start_time=start_time,
+            extra_filters=extra_filters,
+            page_size=page_size,
+            client=client,
+        )
+    )
+
+
+def load_checkpoint(path: str) -> Dict[str, Any] | None:
+    """
+    Load a sync checkpoint.
+
+    Args:
+        path: Path to the checkpoint file
+
+    Returns:
+        Checkpoint with the last timestamp and the insertIds seen at that
+        timestamp, or None if no checkpoint exists
+    """
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, log_entries: List[Dict[str, Any]]) -> None:
+    """
+    Save a sync checkpoint for the last timestamp in log_entries.
+
+    Several entries can share the last timestamp, so all of their insertIds
+    are kept to de-duplicate them on the next run.
+
+    Args:
+        path: Path to the checkpoint file
+        log_entries: Log entries in ascending timestamp order
+    """
+    last_timestamp = log_entries[-1]["timestamp"]
+    checkpoint = {
+        "timestamp": last_timestamp,
+        "insert_ids": [
+            entry["insertId"]
+            for entry in log_entries
+            if entry["timestamp"] == last_timestamp
+        ],
+    }
+
+    # Write to a temporary file first so an interrupted run keeps the old one
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def append_to_store(log_entries: List[Dict[str, Any]], path: str) -> None:
+    """
+    Append log entries to a JSON Lines store.
+
+    Args:
+        log_entries: Log entries to append
+        path: Path to the store file
+    """
+    with open(path, "a") as f:
+        for entry in log_entries:
+            f.write(json.dumps(entry) + "\n")
+
+
+def sync_logs(
+    project_id: str,
+    reasoning_engine_id: str,
+    location: str = "us-central1",
+    minutes: int = 5,
+    output_dir: str = ".",
+    parallel: int = 1,
+    shards: int | None = None,
+    extra_filters: List[str] | None = None,
+    page_size: int = MAX_PAGE_SIZE,
+    client: logging.Client | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Download only the entries newer than the last sync of this engine.
+
+    Entries are de-duplicated on insertId and appended to
+    <output_dir>/<reasoning_engine_id>.jsonl. The first sync of an engine
+    falls back to the last N minutes.
+
+    Args:
+        project_id: GCP project ID
+        reasoning_engine_id: Reasoning Engine ID to filter logs
+        location: GCP location (default: us-central1)
+        minutes: Number of minutes to look back on the first sync (default: 5)
+        output_dir: Directory holding the store and checkpoints
+        parallel: Number of shards fetched concurrently (default: 1)
+        shards: Number of time shards (default: same as parallel)
+        extra_filters: Additional filter expressions, see build_extra_filters
+        page_size: Number of entries per API call (default: 1000)
+        client: Cloud Logging client to reuse (default: a new client)
+
+    Returns:
+        List of new log entries
+    """
+    checkpoint_dir = os.path.join(output_dir, "checkpoints")
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    checkpoint_path = os.path.join(checkpoint_dir, f"{reasoning_engine_id}.json")
+    store_path = os.path.join(output_dir, f"{reasoning_engine_id}.jsonl")
+
+    checkpoint = load_checkpoint(checkpoint_path)
+    start_time = None
+    seen_ids = set()
+    if checkpoint:
+        print(f"Resuming from checkpoint: {checkpoint['timestamp']}")
+        start_time = datetime.fromisoformat(checkpoint["timestamp"])
+        seen_ids = set(checkpoint["insert_ids"])
+
+    log_entries = download_logs(
+        project_id=project_id,
+        reasoning_engine_id=reasoning_engine_id,
+        location=location,
+        minutes=minutes,
+        parallel=parallel,
+        shards=shards,
+        start_time=start_time,
+        extra_filters=extra_filters,
+        page_size=page_size,
+        client=client,
+    )
+
+    new_entries = []
+    for entry in log_entries:
+        if entry["insertId"] in seen_ids:
+            continue
+        seen_ids.add(entry["insertId"])
+        new_entries.append(entry)
+
+    if new_entries:
+        append_to_store(new_entries, store_path)
+        # Checkpoint on every fetched entry, so ids already stored at the
+        # last timestamp are remembered too
+        save_checkpoint(checkpoint_path, log_entries)
+        print(f"Appended {len(new_entries)} new log entries to: {store_path}")
+
+    return new_entries
+
+
+def parse_engines(values: List[str], default_location: str) -> List[Tuple[str, str]]:
+    """
+    Parse --engine values of the form ID or LOCATION:ID.
+
+    Args:
+        values: Engine values from the command line
+        default_location: Location used for values without one
+
+    Returns:
+        List of (location, reasoning_engine_id) tuples
+    """
+    engines = []
+    for value in values:
+        location, sep, engine_id = value.rpartition(ENGINE_SEPARATOR)
+        engines.append((location if sep else default_location, engine_id))
+    return engines
+
+
+def discover_engines(project_id: str, locations: List[str]) -> List[Tuple[str, str]]:
+    """
+    List the Reasoning Engines deployed in a project.
+
+    Args:
+        project_id: GCP project ID
+        locations: GCP locations to search
+
+    Returns:
+        List of (location, reasoning_engine_id) tuples
+    """
+    from google.cloud import aiplatform_v1
+
+    engines = []
+    for location in locations:
+        engine_client = aiplatform_v1.ReasoningEngineServiceClient(
+            client_options={"api_endpoint": f"{location}-aiplatform.googleapis.com"}
+        )
+        for engine in engine_client.list_reasoning_engines(
+            parent=f"projects/{project_id}/locations/{location}"
+        ):
+            engines.append((location, engine.name.split("/")[-1]))
+            print(f"Discovered engine: {engine.display_name} ({engine.name})")
+    return engines
+
+
+def collect_from_engines(
+    engines: List[Tuple[str, str]],
+    fetch: Callable[[str, str], List[Dict[str, Any]]],
+    max_engines: int = MAX_ENGINES,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch logs for several engines concurrently and merge them by timestamp.
+
+    Entries keep their reasoningEngineId, so the merged result stays tagged
+    with the engine each entry came from.
+
+    Args:
+        engines: List of (location, reasoning_engine_id) tuples
+        fetch: Function returning the sorted entries of one engine, called
+            with (location, reasoning_engine_id)
+        max_engines: Number of engines fetched at the same time
+
+    Returns:
+        Merged list of log entries in ascending timestamp order
+    """
+    if len(engines) == 1:
+        return fetch(*engines[0])
+
+    max_workers = max(1, min(max_engines, len(engines)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda engine: fetch(*engine), engines))
+
+    for (location, engine_id), entries in zip(engines, results):
+        print(f"{location}/{engine_id}: {len(entries)} log entries")
+    return list(heapq.merge(*results, key=lambda entry: entry["timestamp"] or ""))
+
+
+def follow_logs(
+    project_id: str,
+    reasoning_engine_id: str,
+    location: str = "us-central1",
+    minutes: int = 5,
+    poll_interval: float = 5.0,
+    extra_filters: List[str] | None = None,
+    page_size: int = MAX_PAGE_SIZE,
+) -> None:
+    """
+    Print new log entries as they arrive until interrupted.
+
+    Each poll queries from slightly before the newest entry seen so far,
+    and entries printed before are skipped by insertId. Only a bounded set
+    of recent insertIds is kept, so memory stays constant.
+
+    Args:
+        project_id: GCP project ID
+        reasoning_engine_id: Reasoning Engine ID to filter logs
+        location: GCP location (default: us-central1)
+        minutes: Number of minutes of history to print first (default: 5)
+        poll_interval: Seconds between polls (default: 5)
+        extra_filters: Additional filter expressions, see build_extra_filters
+        page_size: Number of entries per API call (default: 1000)
+    """
     client = logging.Client(project=project_id)
+    seen_ids: OrderedDict[str, None] = OrderedDict()
+    start_time = datetime.now(timezone.utc) - timedelta(minutes=minutes)
+    newest = start_time
 
-    # Calculate time range (last N minutes)
-    end_time = datetime.now(timezone.utc)
-    start_time = end_time - timedelta(minutes=minutes)
+    print(
+        f"Following logs for Reasoning Engine: {reasoning_engine_id} (Ctrl+C to stop)"
+    )
+    while True:
+        end_time = datetime.now(timezone.utc)
+        query_start = max(start_time, newest - timedelta(seconds=FOLLOW_LAG_SECONDS))
+        filter_str = build_filter(
+            location,
+            reasoning_engine_id,
+            query_start,
+            end_time,
+            extra_filters=extra_filters,
+        )
+        for entry in iter_entries(client, filter_str, page_size=page_size):
+            if entry["insertId"] in seen_ids:
+                continue
+            seen_ids[entry["insertId"]] = None
+            if len(seen_ids) > FOLLOW_SEEN_IDS:
+                seen_ids.popitem(last=False)
+            if entry["timestamp"]:
+                newest = max(newest, datetime.fromisoformat(entry["timestamp"]))
+            print(
+                f"{entry['timestamp']} {entry['severity'] or '-':8s} "
+                f"{entry['textPayload']}",
+                flush=True,
+            )
+        time.sleep(poll_interval)
 
-    # Build the filter query
-    filter_str = f"""
-    resource.type="aiplatform.googleapis.com/ReasoningEngine"
-    resource.labels.location="{location}"
-    resource.labels.reasoning_engine_id="{reasoning_engine_id}"
-    timestamp>="{start_time.isoformat()}"
-    timestamp<="{end_time.isoformat()}"
-    """.strip()
 
-    print(f"Querying logs from {start_time.isoformat()} to {end_time.isoformat()}")
-    print(f"Filter: {filter_str}\n")
-
-    # Fetch logs
-    entries = client.list_entries(filter_=filter_str, order_by=logging.ASCENDING)
-
-    # Convert to list of dictionaries
-    log_entries = []
-    for entry in entries:
-        log_dict = {
-            "textPayload": entry.payload if isinstance(entry.payload, str) else None,
-            # "insertId": entry.insert_id,
-            # "resource": {
-            #     "type": entry.resource.type,
-            #     "labels": dict(entry.resource.labels) if entry.resource.labels else {},
-            # },
-            # "timestamp": entry.timestamp.isoformat() if entry.timestamp else None,
-            # "logName": entry.log_name,
-            # "receiveTimestamp": (
-            #     entry.received_timestamp.isoformat()
-            #     if entry.received_timestamp
-            #     else None
-            # ),
-        }
-        log_entries.append(log_dict)
-
-    return log_entries
+def load_from_store(path: str) -> List[Dict[str, Any]]:
+    """
+    Load log entries from a JSON Lines store written by sync_logs.
+
+    Args:
+        path: Path to the store file
+
+    Returns:
+        List of log entries as dictionaries
+    """
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
 
 
 def extract_text_payloads(log_entries: List[Dict[str, Any]]) -> List[str]:
@@ -152,23 +810,247 @@ def print_text_payloads(text_payloads: List[str]) -> None:
     print("=" * 80)
 
 
+def run_query(args: argparse.Namespace) -> None:
+    """
+    Query or aggregate entries in the local SQLite log store.
+
+    Args:
+        args: Parsed arguments of the query subcommand
+    """
+    conn = open_store(args.db)
+    filters = {
+        "since": args.since,
+        "until": args.until,
+        "search": args.search,
+        "severity": args.severity,
+        "engine_id": args.engine,
+    }
+    try:
+        if args.count_by:
+            for group, count in aggregate_entries(conn, args.count_by, **filters):
+                print(f"{count:8d}  {group}")
+            return
+
+        for row in query_entries(conn, limit=args.limit, **filters):
+            print(
+                f"{row['timestamp']} {row['severity'] or '-':8s} "
+                f"{row['engine_id'] or '-'}: {row['text_payload']}"
+            )
+    finally:
+        conn.close()
+
+
+def run_parquet_export(args: argparse.Namespace) -> None:
+    """
+    Stream downloaded logs into day-partitioned Parquet files.
+
+    Args:
+        args: Parsed arguments
+    """
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    export_dir = os.path.join(args.output_dir, "parquet")
+    engines = get_engines(args)
+    prefix = engines[0][1] if len(engines) == 1 else "engines"
+    client = logging.Client(project=args.project_id)
+
+    # Engines are written one after the other, so only one engine's shards
+    # are buffered at a time
+    with ParquetExporter(export_dir, f"{prefix}-{timestamp}") as exporter:
+        for location, engine_id in engines:
+            exporter.write(
+                iter_logs(
+                    project_id=args.project_id,
+                    reasoning_engine_id=engine_id,
+                    location=location,
+                    minutes=args.minutes,
+                    parallel=args.parallel,
+                    shards=args.shards,
+                    extra_filters=get_extra_filters(args),
+                    page_size=args.page_size,
+                    client=client,
+                )
+            )
+    for path in exporter.paths:
+        print(f"Wrote: {path}")
+    print(f"Saved {exporter.rows_written} log entries to: {export_dir}")
+
+
+def get_engines(args: argparse.Namespace) -> List[Tuple[str, str]]:
+    """
+    Resolve the engines selected on the command line.
+
+    Args:
+        args: Parsed arguments
+
+    Returns:
+        List of (location, reasoning_engine_id) tuples
+    """
+    if args.discover:
+        return discover_engines(
+            args.project_id, args.discover_location or [args.location]
+        )
+    if args.engine:
+        return parse_engines(args.engine, args.location)
+    return [(args.location, args.reasoning_engine_id)]
+
+
+def collect_logs(
+    args: argparse.Namespace, engines: List[Tuple[str, str]]
+) -> List[Dict[str, Any]]:
+    """
+    Download (or sync) logs of all selected engines over one shared client.
+
+    Args:
+        args: Parsed arguments
+        engines: List of (location, reasoning_engine_id) tuples
+
+    Returns:
+        Merged list of log entries in ascending timestamp order
+    """
+    client = logging.Client(project=args.project_id)
+    options = {
+        "project_id": args.project_id,
+        "minutes": args.minutes,
+        "parallel": args.parallel,
+        "shards": args.shards,
+        "extra_filters": get_extra_filters(args),
+        "page_size": args.page_size,
+        "client": client,
+    }
+    if args.sync:
+        return collect_from_engines(
+            engines,
+            lambda location, engine_id: sync_logs(
+                reasoning_engine_id=engine_id,
+                location=location,
+                output_dir=args.output_dir,
+                **options,
+            ),
+            max_engines=args.max_engines,
+        )
+    return collect_from_engines(
+        engines,
+        lambda location, engine_id: download_logs(
+            reasoning_engine_id=engine_id, location=location, **options
+        ),
+        max_engines=args.max_engines,
+    )
+
+
+def get_extra_filters(args: argparse.Namespace) -> List[str]:
+    """
+    Build the pushed-down filter expressions from the command-line options.
+
+    Args:
+        args: Parsed arguments
+
+    Returns:
+        List of filter expressions
+    """
+    return build_extra_filters(
+        project_id=args.project_id,
+        severity=args.severity,
+        text=args.text,
+        regex=args.regex,
+        log_name=args.log_name,
+        labels=args.label,
+        text_only=not args.all_payloads,
+    )
+
+
+def run_analyze(args: argparse.Namespace) -> None:
+    """
+    Report tool-call latency from a sync store or a fresh download.
+
+    Args:
+        args: Parsed arguments of the analyze subcommand
+    """
+    if args.input:
+        log_entries = load_from_store(args.input)
+    else:
+        log_entries = collect_logs(args, get_engines(args))
+
+    invocations = parse_invocations(log_entries)
+    if not invocations:
+        print("\nNo tool invocations found in the log entries.")
+        return
+    print_report(invocations, top=args.top)
+
+
+def run_profiles(args: argparse.Namespace) -> None:
+    """
+    Pull the agent's tool-call profiles and print the aggregated report.
+
+    Args:
+        args: Parsed arguments of the profiles subcommand
+    """
+    if not args.profile_dir:
+        raise ValueError("Set --profile-dir, AGENT_PROFILE_DIR or STAGING_BUCKET")
+
+    paths = pull_profiles(
+        args.profile_dir,
+        os.path.join(args.output_dir, "profiles"),
+        function=args.function,
+        limit=args.limit,
+    )
+    if not paths:
+        print(f"\nNo profiles found in {args.profile_dir}")
+        return
+    print_profile_report(paths, sort=args.sort, top=args.top)
+    if args.save:
+        save_merged(paths, args.save)
+        print(f"\nMerged profile saved to {args.save}")
+
+
 def main():
     """Main function to orchestrate log downloading and processing."""
+    config = get_config()
+    project_id = config.project_id or "hello-world-418507"
+    reasoning_engine_id = config.engine_id or "8904095850381180928"
+    location = config.location or "us-central1"
+
     parser = argparse.ArgumentParser(
         description="Download GCP Cloud Logging logs and extract textPayload fields"
     )
     parser.add_argument(
         "--project-id",
-        default="hello-world-418507",
-        help="GCP project ID (default: hello-world-418507)",
+        default=project_id,
+        help=f"GCP project ID (default: GOOGLE_CLOUD_PROJECT or {project_id})",
     )
     parser.add_argument(
         "--reasoning-engine-id",
-        default="8904095850381180928",
-        help="Reasoning Engine ID (default: 8904095850381180928)",
+        default=reasoning_engine_id,
+        help=f"Reasoning Engine ID (default: ENGINE_ID or {reasoning_engine_id})",
     )
     parser.add_argument(
-        "--location", default="us-central1", help="GCP location (default: us-central1)"
+        "--location",
+        default=location,
+        help=f"GCP location (default: GOOGLE_CLOUD_LOCATION or {location})",
+    )
+    parser.add_argument(
+        "--engine",
+        action="append",
+        default=[],
+        help="Reasoning Engine to query concurrently with others, as ID or "
+        "LOCATION:ID (repeatable, overrides --reasoning-engine-id)",
+    )
+    parser.add_argument(
+        "--discover",
+        action="store_true",
+        help="Query every Reasoning Engine deployed in the project",
+    )
+    parser.add_argument(
+        "--discover-location",
+        action="append",
+        default=[],
+        help="Location searched by --discover (repeatable, default: --location)",
+    )
+    parser.add_argument(
+        "--max-engines",
+        type=int,
+        default=MAX_ENGINES,
+        help="Number of engines fetched at the same time, each with its own "
+        f"--parallel shards (default: {MAX_ENGINES})",
     )
     parser.add_argument(
         "--minutes",
@@ -181,18 +1063,222 @@ def main():
         default="logs",
         help="Output directory for JSON file (default: current directory)",
     )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=1,
+        help="Number of time shards fetched concurrently (default: 1)",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=None,
+        help="Number of time shards to split the range into (default: --parallel)",
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Only download entries newer than the last sync and append them "
+        "to <output-dir>/<reasoning-engine-id>.jsonl",
+    )
+    parser.add_argument(
+        "--sqlite",
+        default=None,
+        help="Also load downloaded entries into this SQLite log store",
+    )
+    parser.add_argument(
+        "--severity",
+        default=None,
+        help="Only fetch entries at or above this severity, e.g. WARNING",
+    )
+    parser.add_argument(
+        "--text",
+        default=None,
+        help="Only fetch entries whose textPayload contains this",
+    )
+    parser.add_argument(
+        "--regex",
+        default=None,
+        help="Only fetch entries whose textPayload matches this RE2 expression",
+    )
+    parser.add_argument(
+        "--log-name",
+        default=None,
+        help="Only fetch entries from this log, e.g. stdout or a full logName",
+    )
+    parser.add_argument(
+        "--label",
+        action="append",
+        default=[],
+        help="Only fetch entries with this KEY=VALUE label (repeatable)",
+    )
+    parser.add_argument(
+        "--all-payloads",
+        action="store_true",
+        help="Also fetch entries without a textPayload (default: text only)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=MAX_PAGE_SIZE,
+        help=f"Entries per API call (default: {MAX_PAGE_SIZE})",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "parquet"],
+        default="json",
+        help="Output format (default: json). parquet streams entries into "
+        "<output-dir>/parquet/date=YYYY-MM-DD/, requires pyarrow and cannot be "
+        "combined with --sync or --sqlite",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Print the last --minutes of logs, then keep printing new entries",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between polls in --follow mode (default: 5)",
+    )
+
+    subparsers = parser.add_subparsers(dest="command")
+    query_parser = subparsers.add_parser(
+        "query", help="Query the local SQLite log store"
+    )
+    query_parser.add_argument(
+        "--db", default="logs/logs.db", help="SQLite log store (default: logs/logs.db)"
+    )
+    query_parser.add_argument("--since", help="Start time (ISO 8601, UTC if naive)")
+    query_parser.add_argument("--until", help="End time (ISO 8601, UTC if naive)")
+    query_parser.add_argument(
+        "--search", help="Full-text search on textPayload (FTS5 syntax)"
+    )
+    query_parser.add_argument("--severity", help="Severity to match, e.g. ERROR")
+    query_parser.add_argument("--engine", help="Reasoning Engine ID to match")
+    query_parser.add_argument(
+        "--count-by",
+        choices=sorted(GROUP_BY_COLUMNS),
+        help="Count matching entries grouped by this field",
+    )
+    query_parser.add_argument(
+        "--limit",
+        type=int,
+        default=100,
+        help="Maximum number of entries to print (default: 100)",
+    )
+
+    analyze_parser = subparsers.add_parser(
+        "analyze", help="Report tool-call latency and error rates"
+    )
+    analyze_parser.add_argument(
+        "--input",
+        default=None,
+        help="JSON Lines store written by --sync (default: download logs)",
+    )
+    analyze_parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Number of slowest sessions to show (default: 5)",
+    )
+
+    profiles_parser = subparsers.add_parser(
+        "profiles", help="Pull and aggregate tool-call profiles of the agent"
+    )
+    default_profile_dir = os.getenv("AGENT_PROFILE_DIR") or (
+        f"{config.staging_bucket.rstrip('/')}/profiles"
+        if config.staging_bucket
+        else None
+    )
+    profiles_parser.add_argument(
+        "--profile-dir",
+        default=default_profile_dir,
+        help="Local directory or gs:// prefix of the profiles (default: "
+        "AGENT_PROFILE_DIR or STAGING_BUCKET/profiles)",
+    )
+    profiles_parser.add_argument(
+        "--function", help="Only aggregate profiles of this tool, e.g. check_auth"
+    )
+    profiles_parser.add_argument(
+        "--limit", type=int, help="Only pull the most recent profiles"
+    )
+    profiles_parser.add_argument(
+        "--sort",
+        default="cumulative",
+        help="pstats sort key, e.g. cumulative or tottime (default: cumulative)",
+    )
+    profiles_parser.add_argument(
+        "--top",
+        type=int,
+        default=30,
+        help="Number of rows printed per tool (default: 30)",
+    )
+    profiles_parser.add_argument(
+        "--save", help="Also write the merged profile to this pstats file"
+    )
 
     args = parser.parse_args()
+    if args.format == "parquet" and (args.sync or args.sqlite):
+        # The Parquet export streams entries and does not keep a sync store
+        parser.error("--format parquet cannot be combined with --sync or --sqlite")
+    filter_options = [
+        option
+        for option, value in [
+            ("--severity", args.severity),
+            ("--text", args.text),
+            ("--regex", args.regex),
+            ("--log-name", args.log_name),
+            ("--label", args.label),
+            ("--all-payloads", args.all_payloads),
+        ]
+        if value
+    ]
+    if args.sync and filter_options:
+        # The sync store and checkpoint are kept per engine, a filtered sync
+        # would move the checkpoint past entries it never fetched
+        parser.error(f"--sync cannot be combined with {', '.join(filter_options)}")
+
+    if args.follow and (args.discover or len(args.engine) > 1):
+        parser.error("--follow takes one engine, not --discover or several --engine")
+
+    if args.follow:
+        [(location, engine_id)] = get_engines(args)
+        try:
+            follow_logs(
+                project_id=args.project_id,
+                reasoning_engine_id=engine_id,
+                location=location,
+                minutes=args.minutes,
+                poll_interval=args.poll_interval,
+                extra_filters=get_extra_filters(args),
+                page_size=args.page_size,
+            )
+        except KeyboardInterrupt:
+            print("\nStopped following logs.")
+        return
+
+    if args.command == "query":
+        run_query(args)
+        return
+    if args.command == "analyze":
+        run_analyze(args)
+        return
+    if args.command == "profiles":
+        run_profiles(args)
+        return
 
     try:
+        if args.format == "parquet":
+            run_parquet_export(args)
+            return
+
         # Download logs
-        print(f"Downloading logs for Reasoning Engine: {args.reasoning_engine_id}")
-        log_entries = download_logs(
-            project_id=args.project_id,
-            reasoning_engine_id=args.reasoning_engine_id,
-            location=args.location,
-            minutes=args.minutes,
-        )
+        engines = get_engines(args)
+        for location, engine_id in engines:
+            print(f"Downloading logs for Reasoning Engine: {location}/{engine_id}")
+        log_entries = collect_logs(args, engines)
 
         if not log_entries:
             print("\nNo log entries found matching the criteria.")
@@ -201,8 +1287,18 @@ def main():
         # Extract textPayload values
         text_payloads = extract_text_payloads(log_entries)
 
-        # Save to JSON file
-        save_to_json(log_entries, text_payloads, args.output_dir)
+        # Save to JSON file (sync mode already appended to its store)
+        if not args.sync:
+            save_to_json(log_entries, text_payloads, args.output_dir)
+
+        # Load into the SQLite log store
+        if args.sqlite:
+            conn = open_store(args.sqlite)
+            try:
+                inserted = insert_entries(conn, log_entries)
+            finally:
+                conn.close()
+            print(f"Loaded {inserted} new log entries into: {args.sqlite}")
 
         # Print to stdout
         print_text_payloads(text_payloads)
@@ -0,0 +1,234 @@
+"""
+Tool-call latency analytics derived from Reasoning Engine logs.
+
+The deployed agent logs its tool activity as plain text lines (see
+auth_agent/agent.py). This module matches those lines to reconstruct the
+tool calls of each session and reports latency percentiles, error rates and
+the slowest sessions, without changing or redeploying the agent.
+"""
+
+import math
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List
+
+# (tool, event) for each textPayload prefix logged by the agent tools.
+# "start" opens a call, "end" and "error" close it, "step" is informational.
+TOOL_MARKERS = [
+    ("Access token: ", "check_auth", "start"),
+    ("Token info from Google API:", "check_auth", "step"),
+    ("Error extracting user info from Google API:", "check_auth", "error"),
+    ("Error checking auth:", "check_auth", "error"),
+    ("check_auth state after:", "check_auth", "end"),
+    ("send_email, to:", "send_email", "start"),
+    ("Error sending email:", "send_email", "error"),
+    ("Email sent successfully:", "send_email", "end"),
+    # Outbox mode, delivery is logged later by a worker thread without a session
+    ("Email queued:", "send_email", "end"),
+]
+
+# Labels that identify an ADK session, checked before falling back to trace
+SESSION_LABELS = ["session_id", "adk_session_id", "gcp.vertex.agent.session_id"]
+
+
+def match_marker(text: str) -> tuple[str, str] | None:
+    """
+    Match a textPayload against the known tool markers.
+
+    Args:
+        text: textPayload of a log entry
+
+    Returns:
+        (tool, event) tuple, or None if the line is not a tool marker
+    """
+    for prefix, tool, event in TOOL_MARKERS:
+        if prefix in text:
+            return tool, event
+    return None
+
+
+def session_key(entry: Dict[str, Any]) -> str:
+    """
+    Identify the session a log entry belongs to.
+
+    Args:
+        entry: Log entry dictionary
+
+    Returns:
+        Session label, trace ID, or "unknown"
+    """
+    labels = entry.get("labels") or {}
+    for label in SESSION_LABELS:
+        if labels.get(label):
+            return labels[label]
+    if entry.get("trace"):
+        return entry["trace"].split("/")[-1]
+    return "unknown"
+
+
+def parse_invocations(log_entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Reconstruct tool invocations from log entries.
+
+    Args:
+        log_entries: Log entry dictionaries with textPayload and timestamp
+
+    Returns:
+        List of invocation records with tool, session, start, end,
+        duration_ms and status (ok, error or incomplete)
+    """
+    invocations = []
+    # Open call per (session, tool)
+    open_calls: Dict[tuple[str, str], Dict[str, Any]] = {}
+
+    entries = [e for e in log_entries if e.get("textPayload") and e.get("timestamp")]
+    entries.sort(key=lambda e: e["timestamp"])
+
+    for entry in entries:
+        marker = match_marker(entry["textPayload"])
+        if marker is None:
+            continue
+        tool, event = marker
+        session = session_key(entry)
+        timestamp = datetime.fromisoformat(entry["timestamp"])
+        key = (session, tool)
+
+        if event == "start":
+            # A new start without an end means the previous call never finished
+            if key in open_calls:
+                invocations.append(open_calls.pop(key))
+            open_calls[key] = {
+                "tool": tool,
+                "session": session,
+                "start": timestamp,
+                "end": None,
+                "duration_ms": None,
+                "status": "incomplete",
+            }
+        elif event in ("end", "error") and key in open_calls:
+            call = open_calls.pop(key)
+            call["end"] = timestamp
+            call["duration_ms"] = (timestamp - call["start"]).total_seconds() * 1000
+            call["status"] = "ok" if event == "end" else "error"
+            invocations.append(call)
+
+    invocations.extend(open_calls.values())
+    invocations.sort(key=lambda call: call["start"])
+    return invocations
+
+
+def percentile(values: List[float], pct: float) -> float | None:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values: Values to summarize
+        pct: Percentile between 0 and 100
+
+    Returns:
+        Percentile value, or None for an empty list
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize_tools(invocations: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Compute per-tool latency percentiles and error rates.
+
+    Args:
+        invocations: Records returned by parse_invocations
+
+    Returns:
+        Mapping of tool name to its summary
+    """
+    by_tool: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for call in invocations:
+        by_tool[call["tool"]].append(call)
+
+    summary = {}
+    for tool, calls in sorted(by_tool.items()):
+        durations = [c["duration_ms"] for c in calls if c["duration_ms"] is not None]
+        errors = sum(1 for c in calls if c["status"] == "error")
+        summary[tool] = {
+            "calls": len(calls),
+            "errors": errors,
+            "incomplete": sum(1 for c in calls if c["status"] == "incomplete"),
+            "error_rate": errors / len(calls),
+            "p50_ms": percentile(durations, 50),
+            "p90_ms": percentile(durations, 90),
+            "p99_ms": percentile(durations, 99),
+            "max_ms": max(durations) if durations else None,
+        }
+    return summary
+
+
+def slowest_sessions(
+    invocations: List[Dict[str, Any]], top: int = 5
+) -> List[Dict[str, Any]]:
+    """
+    Rank sessions by total time spent in tool calls.
+
+    Args:
+        invocations: Records returned by parse_invocations
+        top: Number of sessions to return
+
+    Returns:
+        List of session summaries with their tool-call timeline
+    """
+    by_session: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for call in invocations:
+        by_session[call["session"]].append(call)
+
+    sessions = [
+        {
+            "session": session,
+            "total_ms": sum(c["duration_ms"] or 0 for c in calls),
+            "timeline": calls,
+        }
+        for session, calls in by_session.items()
+    ]
+    sessions.sort(key=lambda s: s["total_ms"], reverse=True)
+    return sessions[:top]
+
+
+def _format_ms(value: float | None) -> str:
+    return "-" if value is None else f"{value:.0f}"
+
+
+def print_report(invocations: List[Dict[str, Any]], top: int = 5) -> None:
+    """
+    Print the tool latency report to stdout.
+
+    Args:
+        invocations: Records returned by parse_invocations
+        top: Number of slowest sessions to show
+    """
+    print("\n" + "=" * 80)
+    print("TOOL LATENCY (ms)")
+    print("=" * 80 + "\n")
+    print(
+        f"{'tool':15s} {'calls':>6s} {'errors':>6s} {'err%':>6s} "
+        f"{'p50':>8s} {'p90':>8s} {'p99':>8s} {'max':>8s}"
+    )
+    for tool, stats in summarize_tools(invocations).items():
+        print(
+            f"{tool:15s} {stats['calls']:6d} {stats['errors']:6d} "
+            f"{stats['error_rate'] * 100:5.1f}% "
+            f"{_format_ms(stats['p50_ms']):>8s} {_format_ms(stats['p90_ms']):>8s} "
+            f"{_format_ms(stats['p99_ms']):>8s} {_format_ms(stats['max_ms']):>8s}"
+        )
+
+    print("\n" + "=" * 80)
+    print(f"SLOWEST SESSIONS (top {top})")
+    print("=" * 80)
+    for session in slowest_sessions(invocations, top):
+        print(f"\n{session['session']}: {session['total_ms']:.0f} ms in tools")
+        for call in session["timeline"]:
+            print(
+                f"  {call['start'].isoformat()} {call['tool']:15s} "
+                f"{_format_ms(call['duration_ms']):>8s} ms  {call['status']}"
+            )
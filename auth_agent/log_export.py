@@ -0,0 +1,142 @@
+"""
+Columnar (Parquet) export of downloaded Reasoning Engine logs.
+
+Entries are written in row-group batches while they are downloaded, into
+one file per day under a hive-style date=YYYY-MM-DD directory, so a whole
+export can be loaded with pandas.read_parquet(<export dir>).
+
+Requires pyarrow (uv run --with pyarrow download_logs.py --format parquet).
+"""
+
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List
+
+from log_analytics import SESSION_LABELS
+
+# Number of entries per Parquet row group
+ROW_GROUP_SIZE = 50000
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Parquet export requires pyarrow. Install it with `uv add pyarrow` "
+            "or run with `uv run --with pyarrow download_logs.py`."
+        ) from e
+    return pyarrow, pyarrow.parquet
+
+
+def to_row(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a log entry dictionary to a typed Parquet row.
+
+    Args:
+        entry: Log entry as returned by download_logs
+
+    Returns:
+        Row dictionary matching the export schema
+    """
+    labels = entry.get("labels") or {}
+    session_id = next(
+        (labels[label] for label in SESSION_LABELS if labels.get(label)), None
+    )
+    trace = entry.get("trace")
+    return {
+        "timestamp": datetime.fromisoformat(entry["timestamp"]).astimezone(
+            timezone.utc
+        ),
+        "severity": entry.get("severity"),
+        "engine_id": entry.get("reasoningEngineId"),
+        "session_id": session_id,
+        "trace_id": trace.split("/")[-1] if trace else None,
+        "span_id": entry.get("spanId"),
+        "insert_id": entry.get("insertId"),
+        "text_payload": entry.get("textPayload"),
+    }
+
+
+class ParquetExporter:
+    """Write log entries to day-partitioned Parquet files in row-group batches."""
+
+    def __init__(self, output_dir: str, file_prefix: str):
+        """
+        Args:
+            output_dir: Root directory of the export
+            file_prefix: File name prefix, e.g. the engine ID and download time
+        """
+        self.pa, self.pq = _require_pyarrow()
+        self.output_dir = output_dir
+        self.file_prefix = file_prefix
+        self.schema = self.pa.schema(
+            [
+                ("timestamp", self.pa.timestamp("us", tz="UTC")),
+                ("severity", self.pa.dictionary(self.pa.int8(), self.pa.string())),
+                ("engine_id", self.pa.dictionary(self.pa.int32(), self.pa.string())),
+                ("session_id", self.pa.string()),
+                ("trace_id", self.pa.string()),
+                ("span_id", self.pa.string()),
+                ("insert_id", self.pa.string()),
+                ("text_payload", self.pa.string()),
+            ]
+        )
+        self.writers = {}
+        self.buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self.paths: List[str] = []
+        self.rows_written = 0
+
+    def write(self, log_entries: Iterable[Dict[str, Any]]) -> None:
+        """
+        Buffer entries and flush a row group whenever a day's buffer is full.
+
+        Args:
+            log_entries: Log entries as returned by download_logs
+        """
+        for entry in log_entries:
+            if not entry.get("timestamp"):
+                continue
+            row = to_row(entry)
+            day = row["timestamp"].date().isoformat()
+            buffer = self.buffers.setdefault(day, [])
+            buffer.append(row)
+            if len(buffer) >= ROW_GROUP_SIZE:
+                self._flush(day)
+
+    def _flush(self, day: str) -> None:
+        rows = self.buffers.pop(day, [])
+        if not rows:
+            return
+        if day not in self.writers:
+            day_dir = os.path.join(self.output_dir, f"date={day}")
+            os.makedirs(day_dir, exist_ok=True)
+            path = os.path.join(day_dir, f"{self.file_prefix}.parquet")
+            self.writers[day] = self.pq.ParquetWriter(
+                path, self.schema, compression="zstd"
+            )
+            self.paths.append(path)
+        table = self.pa.Table.from_pylist(rows, schema=self.schema)
+        self.writers[day].write_table(table)
+        self.rows_written += len(rows)
+
+    def close(self) -> List[str]:
+        """
+        Flush remaining rows and close all files.
+
+        Returns:
+            Paths of the written files
+        """
+        for day in list(self.buffers):
+            self._flush(day)
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+        return self.paths
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,204 @@
+"""
+Local SQLite store for downloaded Reasoning Engine logs.
+
+Entries are indexed by timestamp, severity and engine, and textPayload is
+indexed with FTS5 so searches over large log volumes are index lookups.
+"""
+
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_entries (
+    insert_id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    severity TEXT,
+    engine_id TEXT,
+    text_payload TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_log_entries_timestamp
+    ON log_entries (timestamp);
+CREATE INDEX IF NOT EXISTS idx_log_entries_severity
+    ON log_entries (severity, timestamp);
+CREATE INDEX IF NOT EXISTS idx_log_entries_engine
+    ON log_entries (engine_id, timestamp);
+CREATE VIRTUAL TABLE IF NOT EXISTS log_entries_fts USING fts5 (
+    text_payload, content='log_entries', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS log_entries_ai AFTER INSERT ON log_entries BEGIN
+    INSERT INTO log_entries_fts (rowid, text_payload)
+    VALUES (new.rowid, new.text_payload);
+END;
+"""
+
+# Expressions used to group entries in aggregate_entries
+GROUP_BY_COLUMNS = {
+    "severity": "severity",
+    "engine": "engine_id",
+    "minute": "substr(timestamp, 1, 16)",
+    "hour": "substr(timestamp, 1, 13)",
+    "day": "substr(timestamp, 1, 10)",
+}
+
+
+def open_store(path: str) -> sqlite3.Connection:
+    """
+    Open the log store, creating the schema if needed.
+
+    Args:
+        path: Path to the SQLite database file
+
+    Returns:
+        SQLite connection
+    """
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def to_utc_isoformat(value: str) -> str:
+    """
+    Normalize an ISO 8601 timestamp to UTC so it compares with stored values.
+
+    Args:
+        value: ISO 8601 timestamp, naive values are treated as UTC
+
+    Returns:
+        UTC ISO 8601 timestamp
+    """
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+def insert_entries(conn: sqlite3.Connection, log_entries: List[Dict[str, Any]]) -> int:
+    """
+    Insert log entries, skipping entries that are already stored.
+
+    Args:
+        conn: SQLite connection
+        log_entries: Log entries as returned by download_logs
+
+    Returns:
+        Number of newly inserted entries
+    """
+    with conn:
+        cursor = conn.executemany(
+            "INSERT OR IGNORE INTO log_entries "
+            "(insert_id, timestamp, severity, engine_id, text_payload) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    entry["insertId"],
+                    to_utc_isoformat(entry["timestamp"]),
+                    entry.get("severity"),
+                    entry.get("reasoningEngineId"),
+                    entry.get("textPayload"),
+                )
+                for entry in log_entries
+            ),
+        )
+    return cursor.rowcount
+
+
+def _build_where(
+    since: str | None = None,
+    until: str | None = None,
+    search: str | None = None,
+    severity: str | None = None,
+    engine_id: str | None = None,
+) -> Tuple[str, List[Any]]:
+    """Build the WHERE clause and parameters shared by queries and aggregates."""
+    clauses = []
+    params: List[Any] = []
+    if since:
+        clauses.append("log_entries.timestamp >= ?")
+        params.append(to_utc_isoformat(since))
+    if until:
+        clauses.append("log_entries.timestamp <= ?")
+        params.append(to_utc_isoformat(until))
+    if severity:
+        clauses.append("log_entries.severity = ?")
+        params.append(severity.upper())
+    if engine_id:
+        clauses.append("log_entries.engine_id = ?")
+        params.append(engine_id)
+    if search:
+        clauses.append(
+            "log_entries.rowid IN "
+            "(SELECT rowid FROM log_entries_fts WHERE log_entries_fts MATCH ?)"
+        )
+        params.append(search)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+
+def query_entries(
+    conn: sqlite3.Connection,
+    since: str | None = None,
+    until: str | None = None,
+    search: str | None = None,
+    severity: str | None = None,
+    engine_id: str | None = None,
+    limit: int = 100,
+) -> List[Dict[str, Any]]:
+    """
+    Query stored entries in timestamp order.
+
+    Args:
+        conn: SQLite connection
+        since: Start of the time range (inclusive, ISO 8601)
+        until: End of the time range (inclusive, ISO 8601)
+        search: FTS5 query on textPayload, e.g. 'send_email OR check_auth'
+        severity: Severity to match, e.g. ERROR
+        engine_id: Reasoning Engine ID to match
+        limit: Maximum number of entries to return
+
+    Returns:
+        List of matching entries as dictionaries
+    """
+    where, params = _build_where(since, until, search, severity, engine_id)
+    rows = conn.execute(
+        f"SELECT timestamp, severity, engine_id, text_payload FROM log_entries "
+        f"{where} ORDER BY timestamp LIMIT ?",
+        [*params, limit],
+    )
+    return [dict(row) for row in rows]
+
+
+def aggregate_entries(
+    conn: sqlite3.Connection,
+    group_by: str,
+    since: str | None = None,
+    until: str | None = None,
+    search: str | None = None,
+    severity: str | None = None,
+    engine_id: str | None = None,
+) -> List[Tuple[str, int]]:
+    """
+    Count stored entries grouped by a column or time bucket.
+
+    Args:
+        conn: SQLite connection
+        group_by: One of severity, engine, minute, hour or day
+        since: Start of the time range (inclusive, ISO 8601)
+        until: End of the time range (inclusive, ISO 8601)
+        search: FTS5 query on textPayload
+        severity: Severity to match
+        engine_id: Reasoning Engine ID to match
+
+    Returns:
+        List of (group, count) tuples ordered by group
+    """
+    column = GROUP_BY_COLUMNS[group_by]
+    where, params = _build_where(since, until, search, severity, engine_id)
+    rows = conn.execute(
+        f"SELECT {column} AS grp, COUNT(*) AS n FROM log_entries "
+        f"{where} GROUP BY grp ORDER BY grp",
+        params,
+    )
+    return [(row["grp"], row["n"]) for row in rows]
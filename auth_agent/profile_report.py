@@ -0,0 +1,117 @@
+"""
+Pull and aggregate the tool-call profiles written by the deployed agent.
+
+With AGENT_PROFILE_RATE set, the agent writes one pstats file per profiled
+tool call to AGENT_PROFILE_DIR (see auth_agent/profiling.py). This module
+copies those files from a local directory or a gs:// prefix and merges them
+into one pstats report per function.
+"""
+
+import os
+import pstats
+import shutil
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+PROFILE_SUFFIX = ".pstats"
+
+
+def split_gcs_uri(uri: str) -> Tuple[str, str]:
+    """Split gs://bucket/prefix into (bucket, prefix)."""
+    bucket, _, prefix = uri[len("gs://") :].partition("/")
+    return bucket, prefix.rstrip("/")
+
+
+def function_name(file_name: str) -> str:
+    """Function of a profile file named <function>-<timestamp>-<id>.pstats."""
+    return os.path.basename(file_name).rsplit("-", 2)[0]
+
+
+def pull_profiles(
+    profile_dir: str,
+    dest_dir: str,
+    function: str | None = None,
+    limit: int | None = None,
+    max_workers: int = 8,
+) -> List[str]:
+    """
+    Copy profiles to dest_dir, skipping files already there.
+
+    Args:
+        profile_dir: Local directory or gs:// prefix written by the agent
+        dest_dir: Local directory to copy the profiles into
+        function: Only pull profiles of this function
+        limit: Only pull the most recent profiles
+        max_workers: Concurrent downloads from Cloud Storage
+
+    Returns:
+        Local paths of the pulled profiles, oldest first
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+
+    if profile_dir.startswith("gs://"):
+        from google.cloud import storage
+
+        bucket_name, prefix = split_gcs_uri(profile_dir)
+        bucket = storage.Client().bucket(bucket_name)
+        blobs = [
+            blob
+            for blob in bucket.list_blobs(prefix=f"{prefix}/" if prefix else None)
+            if blob.name.endswith(PROFILE_SUFFIX)
+        ]
+        sources = {os.path.basename(blob.name): blob for blob in blobs}
+    else:
+        sources = {
+            name: os.path.join(profile_dir, name)
+            for name in os.listdir(profile_dir)
+            if name.endswith(PROFILE_SUFFIX)
+        }
+
+    # File names sort by function and then by timestamp
+    names = sorted(
+        (name for name in sources if not function or function_name(name) == function),
+        key=lambda name: name.rsplit("-", 2)[1],
+    )
+    if limit:
+        names = names[-limit:]
+
+    def pull(name: str) -> str:
+        path = os.path.join(dest_dir, name)
+        if not os.path.exists(path):
+            source = sources[name]
+            if isinstance(source, str):
+                shutil.copyfile(source, path)
+            else:
+                source.download_to_filename(path)
+        return path
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(pull, names))
+
+
+def print_profile_report(
+    paths: List[str], sort: str = "cumulative", top: int = 30
+) -> None:
+    """
+    Print call counts per function and the merged stats of each function.
+
+    Args:
+        paths: pstats files
+        sort: pstats sort key, e.g. cumulative or tottime
+        top: Number of rows printed per function
+    """
+    counts = Counter(function_name(path) for path in paths)
+    print(f"\n{len(paths)} profiles")
+    for name, count in counts.most_common():
+        print(f"{count:8d}  {name}")
+
+    for name in counts:
+        stats = pstats.Stats(*[p for p in paths if function_name(p) == name])
+        print(f"\n=== {name} ({counts[name]} calls) ===")
+        stats.strip_dirs().sort_stats(sort).print_stats(top)
+
+
+def save_merged(paths: List[str], output: str) -> None:
+    """Merge profiles into one pstats file, e.g. to open with snakeviz."""
+    pstats.Stats(*paths).dump_stats(output)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark of the ServiceNow client against the local stand-in.
+
+Usage:
+    python tests/bench_servicenow.py
+    python tests/bench_servicenow.py --records 5000 --iterations 20 --page-size 500
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servicenow_stub import ServiceNowStub, make_records  # noqa: E402
+
+from auth_agent import servicenow  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--records", type=int, default=2000, help="Records served (default: 2000)"
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=10,
+        help="Full reads of the table (default: 10)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=servicenow.PAGE_SIZE,
+        help=f"Records per request (default: {servicenow.PAGE_SIZE})",
+    )
+    args = parser.parse_args()
+
+    with ServiceNowStub(make_records(args.records)) as stub:
+        start = time.perf_counter()
+        count = 0
+        for _ in range(args.iterations):
+            count += sum(
+                1
+                for _ in servicenow.iter_records(
+                    stub.instance,
+                    "token",
+                    "incident",
+                    limit=args.records,
+                    page_size=args.page_size,
+                )
+            )
+        elapsed = time.perf_counter() - start
+        print(
+            f"Streamed {count} records in {elapsed:.2f}s "
+            f"({count / elapsed:.0f} records/s), {len(stub.requests)} requests, "
+            f"{len(stub.connections)} connection(s)"
+        )
+
+        servicenow._cache = OrderedDict()
+        search = lambda: servicenow.search_records(  # noqa: E731
+            stub.instance, "token", "incident", max_results=servicenow.MAX_RESULTS
+        )
+        start = time.perf_counter()
+        search()
+        uncached = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            search()
+        cached = (time.perf_counter() - start) / args.iterations
+        print(
+            f"search_records({servicenow.MAX_RESULTS}): {uncached * 1000:.1f}ms "
+            f"uncached, {cached * 1000:.3f}ms cached"
+        )
+
+
+if __name__ == "__main__":
+    main()
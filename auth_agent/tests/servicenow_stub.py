@@ -0,0 +1,109 @@
+"""
+Local stand-in for the ServiceNow Table API, used by the tests and the
+benchmark.
+
+It serves generated records over HTTP/1.1 keep-alive and supports the
+parameters the client uses: sysparm_query (field=value clauses joined by ^),
+sysparm_fields, sysparm_limit and sysparm_offset. Every request and every
+client connection is recorded, so paging and connection reuse can be
+checked.
+"""
+
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+TABLE_PREFIX = "/api/now/table/"
+
+
+def make_records(count: int) -> List[Dict[str, Any]]:
+    """Generate incident records with more columns than the client asks for."""
+    return [
+        {
+            "sys_id": f"{i:032x}",
+            "number": f"INC{i:07d}",
+            "short_description": f"Incident {i}",
+            "state": str(i % 7 + 1),
+            "priority": str(i % 5 + 1),
+            "assigned_to": f"user{i % 13}",
+            "opened_at": "2025-01-01 00:00:00",
+            "sys_updated_on": "2025-01-02 00:00:00",
+            "description": "x" * 500,
+        }
+        for i in range(count)
+    ]
+
+
+class ServiceNowStub:
+    """Threaded HTTP server answering Table API GET requests."""
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.records = records
+        self.requests: List[Dict[str, str]] = []
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def instance(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self) -> "ServiceNowStub":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def query(self, table: str, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        rows = self.records if table == "incident" else []
+        for clause in filter(None, params.get("sysparm_query", "").split("^")):
+            field, _, value = clause.partition("=")
+            rows = [row for row in rows if row.get(field) == value]
+        offset = int(params.get("sysparm_offset", 0))
+        limit = int(params.get("sysparm_limit", 10000))
+        rows = rows[offset : offset + limit]
+        if params.get("sysparm_fields"):
+            fields = params["sysparm_fields"].split(",")
+            rows = [{f: row[f] for f in fields if f in row} for row in rows]
+        return rows
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, keep-alive would
+            # otherwise wait on delayed ACKs
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                url = urllib.parse.urlparse(self.path)
+                params = dict(urllib.parse.parse_qsl(url.query))
+                with stub.lock:
+                    stub.connections.add(self.client_address)
+                    stub.requests.append({"path": url.path, **params})
+
+                if not self.headers.get("Authorization", "").startswith("Bearer "):
+                    return self._send(401, {"error": {"message": "Unauthorized"}})
+                if not url.path.startswith(TABLE_PREFIX):
+                    return self._send(404, {"error": {"message": "Not found"}})
+                table = url.path[len(TABLE_PREFIX) :]
+                self._send(200, {"result": stub.query(table, params)})
+
+            def _send(self, status: int, body: Dict[str, Any]) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
@@ -0,0 +1,244 @@
+"""
+Offline checks of download_logs.py against a fake Cloud Logging client.
+
+Like google-cloud-logging's Client.list_entries, the fake returns a plain
+generator and applies the timestamp bounds of the filter.
+"""
+
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from google.api_core.exceptions import ResourceExhausted
+
+import download_logs
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+BOUND_PATTERN = re.compile(r'timestamp(>=|<=|<)"([^"]+)"')
+
+
+def make_entry(insert_id: str, timestamp: datetime) -> SimpleNamespace:
+    return SimpleNamespace(
+        payload=f"payload {insert_id}",
+        timestamp=timestamp,
+        insert_id=insert_id,
+        severity="INFO",
+        resource=SimpleNamespace(labels={"reasoning_engine_id": "engine"}),
+        trace=None,
+        span_id=None,
+        labels={},
+    )
+
+
+def make_entries(count: int, step: timedelta = timedelta(seconds=1)):
+    return [make_entry(f"id-{i:04d}", START + step * i) for i in range(count)]
+
+
+class FakeClient:
+    """Serves entries matching the timestamp bounds of each filter."""
+
+    def __init__(self, entries, fail_after=None):
+        self.entries = sorted(entries, key=lambda entry: entry.timestamp)
+        # Raise ResourceExhausted once, after this many entries
+        self.fail_after = fail_after
+        self.filters = []
+
+    def list_entries(self, filter_, order_by=None, page_size=None):
+        self.filters.append(filter_)
+        return self._generate(filter_)
+
+    def _generate(self, filter_):
+        matches = [e for e in self.entries if self._matches(filter_, e.timestamp)]
+        for i, entry in enumerate(matches):
+            if self.fail_after is not None and i == self.fail_after:
+                self.fail_after = None
+                raise ResourceExhausted("Read quota exceeded")
+            yield entry
+
+    @staticmethod
+    def _matches(filter_, timestamp):
+        for op, value in BOUND_PATTERN.findall(filter_):
+            bound = datetime.fromisoformat(value)
+            if op == ">=" and timestamp < bound:
+                return False
+            if op == "<=" and timestamp > bound:
+                return False
+            if op == "<" and timestamp >= bound:
+                return False
+        return True
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(download_logs.time, "sleep", lambda seconds: None)
+
+
+def ids(log_entries):
+    return [entry["insertId"] for entry in log_entries]
+
+
+def test_iter_entries_streams_the_generator():
+    client = FakeClient(make_entries(5))
+
+    log_entries = list(download_logs.iter_entries(client, "filter"))
+
+    assert ids(log_entries) == [f"id-{i:04d}" for i in range(5)]
+    assert log_entries[0]["timestamp"] == START.isoformat()
+    assert log_entries[0]["reasoningEngineId"] == "engine"
+    assert len(client.filters) == 1
+
+
+def test_iter_entries_resumes_after_resource_exhausted():
+    # Three entries share the timestamp the stream is interrupted at
+    entries = make_entries(4) + [
+        make_entry(f"same-{i}", START + timedelta(seconds=4)) for i in range(3)
+    ]
+    entries += [make_entry("last", START + timedelta(seconds=5))]
+    client = FakeClient(entries, fail_after=5)
+
+    log_entries = list(download_logs.iter_entries(client, "filter"))
+
+    assert ids(log_entries) == ids(download_logs.entry_to_dict(e) for e in entries)
+    assert len(client.filters) == 2
+    assert client.filters[1].endswith(
+        f'timestamp>="{(START + timedelta(seconds=4)).isoformat()}"'
+    )
+
+
+def test_iter_entries_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(download_logs, "MAX_RETRIES", 2)
+
+    class ExhaustedClient:
+        calls = 0
+
+        def list_entries(self, **kwargs):
+            self.calls += 1
+            raise ResourceExhausted("Read quota exceeded")
+
+    client = ExhaustedClient()
+    with pytest.raises(ResourceExhausted):
+        list(download_logs.iter_entries(client, "filter"))
+    assert client.calls == 3
+
+
+def test_split_time_range_is_contiguous():
+    end = START + timedelta(hours=1)
+
+    ranges = download_logs.split_time_range(START, end, 4)
+
+    assert len(ranges) == 4
+    assert ranges[0][0] == START
+    assert ranges[-1][1] == end
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert download_logs.split_time_range(START, end, 0) == [(START, end)]
+
+
+def test_sharded_download_is_merged_in_order():
+    entries = make_entries(60, step=timedelta(minutes=1))
+    client = FakeClient(entries)
+
+    log_entries = download_logs.download_logs(
+        "project",
+        "engine",
+        parallel=3,
+        shards=6,
+        start_time=START,
+        client=client,
+    )
+
+    assert ids(log_entries) == [entry.insert_id for entry in entries]
+    assert len(client.filters) == 6
+
+
+def test_iter_shards_buffers_a_bounded_number_of_entries():
+    produced = []
+
+    class CountingClient(FakeClient):
+        def _generate(self, filter_):
+            for entry in super()._generate(filter_):
+                produced.append(entry)
+                yield entry
+
+    entries = make_entries(4000)
+    bounds = [entries[i * 1000].timestamp for i in range(4)] + [START + timedelta(1)]
+    filters = [
+        f'timestamp>="{a.isoformat()}"\ntimestamp<"{b.isoformat()}"'
+        for a, b in zip(bounds, bounds[1:])
+    ]
+    stream = download_logs.iter_shards(
+        CountingClient(entries), filters, parallel=4, prefetch=10
+    )
+
+    first = [next(stream) for _ in range(100)]
+    # Give the workers time to fill their queues
+    threading.Event().wait(0.2)
+    buffered = len(produced) - len(first)
+    rest = list(stream)
+
+    # Each worker holds its queue plus the entry it is waiting to put
+    assert buffered <= 4 * (10 + 1)
+    assert ids(first + rest) == [entry.insert_id for entry in entries]
+
+
+def sync(client, output_dir):
+    return download_logs.sync_logs(
+        "project", "engine", minutes=60, output_dir=str(output_dir), client=client
+    )
+
+
+def read_checkpoint(output_dir):
+    return download_logs.load_checkpoint(
+        str(output_dir / "checkpoints" / "engine.json")
+    )
+
+
+def test_sync_resumes_from_checkpoint(tmp_path):
+    base = datetime.now(timezone.utc) - timedelta(minutes=10)
+    last = base + timedelta(seconds=2)
+    entries = [
+        make_entry("a", base),
+        make_entry("b", base + timedelta(seconds=1)),
+        make_entry("c", last),
+        make_entry("d", last),
+    ]
+    client = FakeClient(entries)
+
+    first = sync(client, tmp_path)
+
+    assert ids(first) == ["a", "b", "c", "d"]
+    assert read_checkpoint(tmp_path) == {
+        "timestamp": last.isoformat(),
+        "insert_ids": ["c", "d"],
+    }
+
+    # A late entry at the checkpoint timestamp and a newer one
+    client.entries += [
+        make_entry("e", last),
+        make_entry("f", last + timedelta(seconds=1)),
+    ]
+    client.entries.sort(key=lambda entry: entry.timestamp)
+
+    second = sync(client, tmp_path)
+
+    assert f'timestamp>="{last.isoformat()}"' in client.filters[-1]
+    assert ids(second) == ["e", "f"]
+    store = download_logs.load_from_store(str(tmp_path / "engine.jsonl"))
+    assert ids(store) == ["a", "b", "c", "d", "e", "f"]
+    assert read_checkpoint(tmp_path)["insert_ids"] == ["f"]
+
+
+def test_sync_without_new_entries_keeps_checkpoint(tmp_path):
+    base = datetime.now(timezone.utc) - timedelta(minutes=10)
+    client = FakeClient([make_entry("a", base), make_entry("b", base)])
+    sync(client, tmp_path)
+    checkpoint_path = tmp_path / "checkpoints" / "engine.json"
+    checkpoint = checkpoint_path.read_text()
+    store = (tmp_path / "engine.jsonl").read_text()
+
+    # Only the entries at the checkpoint timestamp come back
+    assert sync(client, tmp_path) == []
+
+    assert checkpoint_path.read_text() == checkpoint
+    assert (tmp_path / "engine.jsonl").read_text() == store
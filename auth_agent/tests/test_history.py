@@ -0,0 +1,203 @@
+"""
+Offline checks of the history compaction in auth_agent/history.py.
+
+A scripted fake model stands in for Gemini: every turn calls a tool that
+returns a large payload, then answers in text. The requests the fake model
+receives show what compaction actually sends.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from typing import AsyncGenerator, List
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from auth_agent import history
+
+PAYLOAD_CHARS = 4000
+PROMPT_TOKENS = 123
+
+
+def user(text: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def tool_turn(i: int) -> List[types.Content]:
+    """One turn: question, tool call, large tool response, answer."""
+    return [
+        user(f"question {i}"),
+        types.Content(
+            role="model",
+            parts=[
+                types.Part(
+                    function_call=types.FunctionCall(name="lookup", args={"i": i})
+                )
+            ],
+        ),
+        types.Content(
+            role="user",
+            parts=[
+                types.Part(
+                    function_response=types.FunctionResponse(
+                        name="lookup", response={"data": "x" * PAYLOAD_CHARS}
+                    )
+                )
+            ],
+        ),
+        types.Content(role="model", parts=[types.Part(text=f"answer {i}")]),
+    ]
+
+
+def function_responses(contents: List[types.Content]) -> List[dict]:
+    return [
+        part.function_response.response
+        for content in contents
+        for part in content.parts or []
+        if part.function_response
+    ]
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(
+        history, "history_stats", dict.fromkeys(history.history_stats, 0)
+    )
+
+
+def test_old_tool_responses_are_truncated():
+    contents = [c for i in range(4) for c in tool_turn(i)] + [user("now")]
+
+    compacted = history.compact_history(contents, token_budget=10**6, keep_turns=2)
+
+    responses = function_responses(compacted)
+    # Turns 0-2 are old, turn 3 and the current turn are kept in full
+    assert [list(r) for r in responses] == [["truncated"]] * 3 + [["data"]]
+    assert all(
+        len(r["truncated"]) == history.TOOL_RESPONSE_MAX_CHARS for r in responses[:3]
+    )
+    assert history.history_stats["tool_responses_truncated"] == 3
+    # The session contents are left untouched
+    assert function_responses(contents)[0] == {"data": "x" * PAYLOAD_CHARS}
+
+
+def test_oldest_turns_are_dropped_to_fit_budget():
+    contents = [c for i in range(10) for c in tool_turn(i)] + [user("now")]
+    budget = 1500
+
+    compacted = history.compact_history(contents, token_budget=budget, keep_turns=2)
+
+    assert history.estimate_tokens(compacted) <= budget
+    assert compacted[-1].parts[0].text == "now"
+    # Whole turns are dropped from the front, a turn starts with a user question
+    assert compacted[0].parts[0].text.startswith("question ")
+    assert history.history_stats["turns_dropped"] > 0
+    # Function calls stay paired with their responses
+    calls = sum(1 for c in compacted for p in c.parts if p.function_call)
+    assert calls == len(function_responses(compacted))
+
+
+def test_current_turn_is_kept_over_budget():
+    contents = tool_turn(0) + [user("y" * 10000)]
+
+    compacted = history.compact_history(contents, token_budget=10, keep_turns=2)
+
+    assert compacted[-1] == contents[-1]
+    assert len(compacted) == 1
+
+
+class ScriptedModel(BaseLlm):
+    """Calls the lookup tool once per turn, then answers with text."""
+
+    requests: List[List[types.Content]] = []
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.requests.append(list(llm_request.contents))
+        last = llm_request.contents[-1].parts[0]
+        if last.function_response:
+            part = types.Part(text="done")
+        else:
+            part = types.Part(function_call=types.FunctionCall(name="lookup", args={}))
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=PROMPT_TOKENS
+            ),
+        )
+
+
+def lookup() -> dict:
+    """Return a large payload."""
+    return {"data": "x" * PAYLOAD_CHARS}
+
+
+def test_scripted_conversation(monkeypatch):
+    budget = 2000
+    monkeypatch.setattr(history, "HISTORY_TOKEN_BUDGET", budget)
+    monkeypatch.setattr(history, "HISTORY_KEEP_TURNS", 1)
+    model = ScriptedModel(model="scripted", requests=[])
+    agent = LlmAgent(
+        name="test_agent",
+        model=model,
+        tools=[lookup],
+        before_model_callback=history.compact_model_request,
+        after_model_callback=history.record_model_call,
+    )
+    turns = 8
+
+    async def run():
+        runner = InMemoryRunner(agent=agent, app_name="test")
+        session = await runner.session_service.create_session(
+            app_name="test", user_id="user"
+        )
+        for i in range(turns):
+            async for _ in runner.run_async(
+                user_id="user", session_id=session.id, new_message=user(f"turn {i}")
+            ):
+                pass
+        return await runner.session_service.get_session(
+            app_name="test", user_id="user", session_id=session.id
+        )
+
+    session = asyncio.run(run())
+
+    stats = history.history_stats
+    assert stats["model_calls"] == 2 * turns
+    assert len(model.requests) == 2 * turns
+    assert stats["prompt_tokens_reported"] == PROMPT_TOKENS * 2 * turns
+    assert stats["model_seconds"] > 0
+    assert stats["prompt_tokens_after"] < stats["prompt_tokens_before"]
+    assert stats["turns_dropped"] > 0
+
+    for request in model.requests:
+        assert history.estimate_tokens(request) <= budget
+    last = model.requests[-1]
+    # The current turn is kept, with its own tool response in full
+    texts = [p.text for c in last for p in c.parts if p.text]
+    assert f"turn {turns - 1}" in texts
+    assert "turn 0" not in texts
+    assert function_responses(last)[-1] == {"data": "x" * PAYLOAD_CHARS}
+    # The session still holds every event, compaction only changes requests
+    assert sum(1 for e in session.events if e.get_function_responses()) == turns
+
+
+def test_unfinished_model_calls_are_bounded(monkeypatch):
+    monkeypatch.setattr(history, "MODEL_CALLS_STARTED", 3)
+    monkeypatch.setattr(history, "_model_call_started", history.OrderedDict())
+
+    async def run():
+        for i in range(5):
+            context = SimpleNamespace(invocation_id=f"invocation-{i}")
+            request = LlmRequest(contents=[user("hi")])
+            await history.compact_model_request(context, request)
+
+    asyncio.run(run())
+
+    assert list(history._model_call_started) == [f"invocation-{i}" for i in range(2, 5)]
@@ -0,0 +1,91 @@
+"""Checks of the auth-check fast path in auth_agent/router.py."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import requests
+from google.genai import types
+
+from auth_agent import agent, router
+from log_analytics import match_marker
+
+TOKEN = "ya29.secret-token"
+
+
+def test_renders_authenticated_user():
+    text = router.render_auth_result(
+        {
+            "status": "authenticated",
+            "user_info": {"email": "a@example.com", "scopes": ["email"]},
+        }
+    )
+
+    assert text == "You are authenticated as a@example.com.\nAccess scopes:\n- email"
+
+
+@pytest.mark.parametrize("status", ["error", "not_authenticated"])
+def test_failures_do_not_echo_the_message(status):
+    text = router.render_auth_result(
+        {"status": status, "message": f"Error: url: /tokeninfo?access_token={TOKEN}"}
+    )
+
+    assert TOKEN not in text
+    assert "not" in text
+
+
+def test_token_is_not_sent_in_the_url(monkeypatch):
+    calls = []
+
+    def post(url, data=None, **kwargs):
+        calls.append((url, data))
+        raise requests.ConnectionError(f"Max retries exceeded with url: {url}")
+
+    monkeypatch.setattr(agent.requests, "post", post)
+
+    result = agent.extract_user_info(TOKEN)
+
+    assert calls == [(agent.TOKENINFO_URL, {"access_token": TOKEN})]
+    assert result["status"] == "error"
+    assert TOKEN not in result["message"]
+
+
+def test_unfinished_llm_turns_are_bounded(monkeypatch):
+    monkeypatch.setattr(router, "LLM_TURNS_STARTED", 3)
+    monkeypatch.setattr(router, "_llm_turn_started", router.OrderedDict())
+    monkeypatch.setattr(router, "router_stats", dict.fromkeys(router.router_stats, 0))
+    route = router.make_auth_router(lambda context: {})
+
+    async def run():
+        for i in range(5):
+            await route(
+                SimpleNamespace(
+                    invocation_id=f"invocation-{i}",
+                    user_content=types.Content(
+                        role="user", parts=[types.Part(text="send an email")]
+                    ),
+                )
+            )
+
+    asyncio.run(run())
+
+    assert list(router._llm_turn_started) == [f"invocation-{i}" for i in range(2, 5)]
+    assert router.router_stats["misses"] == 5
+
+
+def test_rejected_token_is_logged_as_an_error(monkeypatch, caplog):
+    monkeypatch.setattr(
+        agent.requests,
+        "post",
+        lambda url, data=None: SimpleNamespace(status_code=400, text="invalid_token"),
+    )
+    tool_context = SimpleNamespace(state={f"temp:{agent.AUTH_ID}": TOKEN})
+
+    result = agent.check_auth(tool_context)
+
+    assert result == {
+        "status": "error",
+        "message": "Failed to get token info from Google API: 400 - invalid_token",
+    }
+    [message] = [r.getMessage() for r in caplog.records if r.levelname == "ERROR"]
+    assert match_marker(message) == ("check_auth", "error")
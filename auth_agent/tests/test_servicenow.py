@@ -0,0 +1,117 @@
+"""Checks of the ServiceNow client against the local stand-in server."""
+
+from collections import OrderedDict
+
+import pytest
+from servicenow_stub import ServiceNowStub, make_records
+
+from auth_agent import servicenow
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(servicenow, "_cache", OrderedDict())
+    monkeypatch.setattr(
+        servicenow, "servicenow_stats", dict.fromkeys(servicenow.servicenow_stats, 0)
+    )
+
+
+@pytest.fixture
+def stub():
+    with ServiceNowStub(make_records(250)) as stub:
+        yield stub
+
+
+def test_pages_with_limit_and_offset(stub):
+    records = list(
+        servicenow.iter_records(stub.instance, "token", "incident", limit=250)
+    )
+
+    assert [r["number"] for r in records] == [f"INC{i:07d}" for i in range(250)]
+    pages = [(int(r["sysparm_limit"]), int(r["sysparm_offset"])) for r in stub.requests]
+    assert pages == [(100, 0), (100, 100), (50, 200)]
+
+
+def test_stops_after_short_page(stub):
+    records = list(servicenow.iter_records(stub.instance, "token", "incident"))
+
+    assert len(records) == 250
+    # The third page has fewer rows than requested, so no fourth request
+    assert len(stub.requests) == 3
+
+
+def test_pages_are_fetched_lazily(stub):
+    records = servicenow.iter_records(stub.instance, "token", "incident")
+
+    next(records)
+
+    assert len(stub.requests) == 1
+
+
+def test_selects_fields(stub):
+    default = servicenow.search_records(stub.instance, "token", "incident")
+    custom = servicenow.search_records(
+        stub.instance, "token", "incident", fields="number,priority"
+    )
+
+    default_fields = servicenow.DEFAULT_FIELDS["incident"]
+    assert stub.requests[0]["sysparm_fields"] == default_fields
+    assert set(default["records"][0]) == set(default_fields.split(","))
+    assert stub.requests[1]["sysparm_fields"] == "number,priority"
+    assert set(custom["records"][0]) == {"number", "priority"}
+
+
+def test_results_are_cached_per_user_until_ttl(stub, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(servicenow.time, "monotonic", lambda: now[0])
+    search = lambda token: servicenow.search_records(  # noqa: E731
+        stub.instance, token, "incident", query="priority=1"
+    )
+
+    first = search("token-a")
+    second = search("token-a")
+    other_user = search("token-b")
+    now[0] += servicenow.SERVICENOW_CACHE_TTL + 1
+    expired = search("token-a")
+
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert second["records"] == first["records"]
+    assert other_user["cached"] is False
+    assert expired["cached"] is False
+    assert len(stub.requests) == 3
+    assert servicenow.servicenow_stats["hits"] == 1
+
+
+def test_reuses_one_connection(stub):
+    for _ in range(20):
+        list(servicenow.iter_records(stub.instance, "token", "incident", limit=100))
+
+    assert len(stub.requests) == 20
+    assert len(stub.connections) == 1
+
+
+def test_get_record_by_number_and_sys_id(stub):
+    by_number = servicenow.get_record(stub.instance, "token", "incident", "INC0000042")
+    by_sys_id = servicenow.get_record(stub.instance, "token", "incident", f"{42:032x}")
+    missing = servicenow.get_record(stub.instance, "token", "incident", "INC9999999")
+
+    assert by_number["number"] == by_sys_id["number"] == "INC0000042"
+    assert missing is None
+    assert stub.requests[0]["sysparm_query"] == "number=INC0000042"
+
+
+@pytest.mark.parametrize(
+    "table, record_id, fields",
+    [
+        ("incident/../sys_user", "INC0000042", ""),
+        ("incident?x=1", "INC0000042", ""),
+        ("incident", "INC001^ORactive=true", ""),
+        ("incident", "42", ""),
+        ("incident", "INC0000042", "number,^ORactive=true"),
+    ],
+)
+def test_rejects_invalid_input(stub, table, record_id, fields):
+    with pytest.raises(ValueError):
+        servicenow.get_record(stub.instance, "token", table, record_id, fields)
+
+    assert stub.requests == []
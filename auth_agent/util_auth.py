@@ -10,10 +10,9 @@ from datetime import datetime, timedelta
 from http.server import BaseHTTPRequestHandler, HTTPServer
 
 import requests
-from dotenv import load_dotenv
 from google.cloud import secretmanager
 
-load_dotenv()
+from config import get_config
 
 logger = logging.getLogger(__name__)
 sm_client = secretmanager.SecretManagerServiceClient()
@@ -26,8 +25,9 @@ def get_secret(secret_id, project_id):
 
 
 # ServiceNow OAuth Configuration
-SERVICENOW_INSTANCE = os.getenv("SERVICENOW_INSTANCE")
-PROJECT_ID = os.getenv("GOOGLE_CLOUD_PROJECT")
+config = get_config().require("project_id", "servicenow_instance")
+SERVICENOW_INSTANCE = config.servicenow_instance
+PROJECT_ID = config.project_id
 client_id = get_secret("AUSPOST_CLIENT_ID", PROJECT_ID)
 client_secret = get_secret("AUSPOST_CLIENT_SECRET", PROJECT_ID)
 